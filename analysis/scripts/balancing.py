@@ -0,0 +1,120 @@
+"""Stratified balancing of a dataset towards target ratios"""
+
+from typing import Any, Dict, Hashable, List, Sequence, Tuple
+
+from numpy import (
+    arange,
+    argsort,
+    array,
+    concatenate,
+    cumsum,
+    floor,
+    maximum,
+    min_scalar_type,
+    minimum,
+    ndarray,
+)
+from numpy.random import default_rng
+from pandas import DataFrame
+
+TARGET_FIELDS: List[str] = [
+    "gender",
+    "in_hypertension",
+    "cholesterol",
+    "gluc",
+    "smoke",
+    "alco",
+    "active",
+    "cardio",
+]
+
+# a field, or a tuple of fields for joint strata, e.g.
+# {("gender", "cardio"): {("FEMALE", True): 0.25, ...}}
+Strata = str | Tuple[str, ...]
+
+
+def get_ratios(
+    dataset: DataFrame, fields: Sequence[str] = TARGET_FIELDS
+) -> Dict[str, Dict[Any, float]]:
+    """Proportion of each value of each field"""
+    return {
+        field: dataset[field].value_counts(normalize=True, sort=False).to_dict()
+        for field in fields
+    }
+
+
+def _strata(
+    dataset: DataFrame, strata: Strata
+) -> Tuple[ndarray, List[Hashable], ndarray]:
+    """Stratum code of each row, the value (tuple of values for joint
+    strata) and the size of each stratum; the rows with a missing value of
+    the strata fields are in no stratum, their code is -1"""
+    sizes_by_stratum = dataset.groupby(
+        list(strata) if isinstance(strata, tuple) else strata,
+        sort=False,
+        observed=True,
+    )
+    # ngroup numbers the rows dropped by the groupby -1 or NaN (pandas 3)
+    codes = sizes_by_stratum.ngroup().fillna(-1).to_numpy(dtype=int)
+    sizes = sizes_by_stratum.size()
+    return codes, list(sizes.index), sizes.to_numpy()
+
+
+def stratum_targets(
+    available: ndarray, ratios: ndarray, number_rows: int, tolerance: float
+) -> ndarray:
+    """Number of rows to draw from each stratum: the ratio of the dataset,
+    at most the stratum, at least (1 - tolerance) of the stratum"""
+    return maximum(
+        minimum(floor(number_rows * ratios), available), available * (1 - tolerance)
+    ).astype(int)
+
+
+def _draw(
+    codes: ndarray, available: ndarray, targets: ndarray, permutation: ndarray
+) -> ndarray:
+    """Positions of targets[code] random rows of each stratum, in one pass:
+    the rows are shuffled then stably sorted by stratum (a radix sort on the
+    small integer codes), and the first ones of each stratum are kept
+    The rows in no stratum (code -1) are never drawn"""
+    permutation = permutation[codes[permutation] >= 0]
+    shuffled_codes = codes[permutation].astype(min_scalar_type(len(available)))
+    order = permutation[argsort(shuffled_codes, kind="stable")]
+    sorted_codes = codes[order]
+    stratum_starts = cumsum(available) - available
+    rank = arange(len(order)) - stratum_starts[sorted_codes]
+    return order[rank < targets[sorted_codes]]
+
+
+def balance_dataset(
+    dataset: DataFrame,
+    ratios: Dict[Strata, Dict[Any, float]],
+    tolerance: float,
+    random_state: int = 42,
+) -> DataFrame:
+    """Balanced dataset: for each field (or tuple of fields) of ratios, rows
+    of each listed value are drawn (see stratum_targets), then all the draws
+    are shuffled with replacement, as the balancing notebook does.
+    The targets are computed once per strata and all the rows are gathered
+    by a single indexing, the same random_state giving the same dataset
+    """
+    generator = default_rng(random_state)
+    positions = []
+    for strata, strata_ratios in ratios.items():
+        codes, values, available = _strata(dataset, strata)
+        listed = array([value in strata_ratios for value in values], dtype=bool)
+        targets = stratum_targets(
+            available,
+            array([strata_ratios.get(value, 0.0) for value in values], dtype=float),
+            len(dataset),
+            tolerance,
+        )
+        targets[~listed] = 0
+        positions.append(
+            _draw(codes, available, targets, generator.permutation(len(dataset)))
+        )
+
+    drawn = concatenate(positions) if positions else array([], dtype=int)
+    if len(drawn):
+        drawn = drawn[generator.integers(0, len(drawn), len(drawn))]
+    return dataset.iloc[drawn].reset_index(drop=True)
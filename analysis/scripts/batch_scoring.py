@@ -0,0 +1,254 @@
+"""Streaming scoring of a csv or parquet file of patients with a saved model.
+
+The file is read by chunks in a reader thread, each chunk is cleaned, featurized and scored by a pool of workers,
+and the predictions are written in the order of the file by the calling thread as soon as their chunk is ready.
+At most a bounded number of chunks are in flight, so the memory does not depend on the size of the file.
+
+Usage:
+    python -m scripts.batch_scoring model.bin ../data/original/cardio_train.csv predictions.csv
+"""
+
+from argparse import ArgumentParser
+from concurrent.futures import Future, ThreadPoolExecutor
+from importlib import import_module
+from importlib.util import find_spec
+from os import cpu_count
+from pathlib import Path
+from queue import Empty, Queue
+from threading import Event, Thread
+from typing import Any, Callable, Dict, Iterator, Optional, Sequence
+
+from numpy import zeros
+from pandas import DataFrame
+
+from scripts.create_patient import ID_STR
+from scripts.design import MODEL_FEATURES, encode_features, patient_frame
+from scripts.generic_methods import (
+    BOOLEANIZED_CARDIO_DTYPES,
+    CARDIO_DTYPES,
+    load_dataset,
+)
+from scripts.models import load_model, positive_probability
+
+PARQUET_SUFFIXES = (".parquet", ".pq")
+
+
+def read_chunks(
+    path: str | Path, sep: str, chunk_size: int, booleanized: bool = False
+) -> Iterator[DataFrame]:
+    """Chunks of chunk_size rows of a csv (parsed as load_dataset does) or of a
+    parquet file, in the cardio dtypes"""
+    dtypes = BOOLEANIZED_CARDIO_DTYPES if booleanized else CARDIO_DTYPES
+    if Path(path).suffix not in PARQUET_SUFFIXES:
+        yield from load_dataset(path, sep, chunk_size=chunk_size, dtypes=dtypes)
+        return
+    parquet_file = import_module("pyarrow.parquet").ParquetFile(path)
+    for batch in parquet_file.iter_batches(batch_size=chunk_size):
+        chunk = batch.to_pandas()
+        yield chunk.astype(
+            {column: dtypes[column] for column in chunk.columns if column in dtypes}
+        )
+
+
+def score_chunk(
+    model: Any,
+    chunk: DataFrame,
+    features: Sequence[str] = MODEL_FEATURES,
+    booleanized: bool = False,
+    keep_invalid: bool = False,
+) -> DataFrame:
+    """Id, probability and prediction of the patients of a chunk, the invalid
+    ones dropped as the cleaning does (flagged by is_valid when kept)"""
+    patients = patient_frame(chunk, booleanized)
+    is_valid = patients.is_valid.to_numpy()
+    frame = patients.to_dataframe(features)
+    ids = chunk[ID_STR].to_numpy()
+    if not keep_invalid:
+        frame, ids = frame[is_valid], ids[is_valid]
+    probabilities = (
+        positive_probability(model, encode_features(frame, features))
+        if len(frame)
+        else zeros(0)
+    )
+    scores = {
+        ID_STR: ids,
+        "probability": probabilities,
+        "prediction": probabilities > getattr(model, "threshold", 0.5),
+    }
+    if keep_invalid:
+        scores["is_valid"] = is_valid
+    return DataFrame(scores)
+
+
+class _PredictionWriter:
+    """Appender of scored chunks to a parquet or a csv file, with the writers
+    of pyarrow (to_csv without it, many times slower on the floats)"""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.writer = None
+        self.file = None
+
+    def write(self, scores: DataFrame) -> None:
+        is_parquet = self.path.suffix in PARQUET_SUFFIXES
+        if not is_parquet and find_spec("pyarrow") is None:
+            header = self.file is None
+            if header:
+                self.file = open(self.path, "w", newline="")
+            scores.to_csv(self.file, index=False, header=header)
+            return
+        table = import_module("pyarrow").Table.from_pandas(
+            scores, preserve_index=False
+        )
+        if self.writer is None:
+            self.writer = (
+                import_module("pyarrow.parquet").ParquetWriter
+                if is_parquet
+                else import_module("pyarrow.csv").CSVWriter
+            )(self.path, table.schema)
+        self.writer.write_table(table)
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+        if self.file is not None:
+            self.file.close()
+
+
+def _number_workers(n_jobs: Optional[int]) -> int:
+    """Number of scoring threads: 2 for None, all the cores for a negative
+    n_jobs, n_jobs otherwise
+    Raises a ValueError for 0"""
+    if n_jobs is None:
+        return 2
+    if n_jobs < 0:
+        return cpu_count() or 1
+    if n_jobs == 0:
+        raise ValueError("n_jobs must be at least 1, or negative for all the cores")
+    return n_jobs
+
+
+def _read_and_submit(
+    chunks: Iterator[DataFrame],
+    submit: Callable[[DataFrame], Future],
+    scored: "Queue[Optional[Future]]",
+    stop: Event,
+) -> None:
+    """Reader thread: submits each chunk to the workers and queues its
+    future, blocking while the queue is full; None marks the end"""
+    try:
+        for chunk in chunks:
+            if stop.is_set():
+                return
+            scored.put(submit(chunk))
+    except Exception as error:
+        failed: Future = Future()
+        failed.set_exception(error)
+        scored.put(failed)
+    finally:
+        scored.put(None)
+
+
+def score_file(
+    model_path: str | Path,
+    input_path: str | Path,
+    output_path: str | Path,
+    sep: str = ";",
+    chunk_size: int = 100_000,
+    n_jobs: Optional[int] = None,
+    features: Sequence[str] = MODEL_FEATURES,
+    booleanized: bool = False,
+    keep_invalid: bool = False,
+) -> Dict[str, int]:
+    """Write the predictions (csv or parquet, from the suffix) of all the
+    patients of the input file, reading, scoring (n_jobs threads, 2 for None
+    and all the cores for -1, numpy and the parsers releasing the GIL) and
+    writing chunks at the same time
+    At most 2 * n_jobs chunks are queued between the reader and the writer
+    Returns the number of patients read and of predictions written"""
+    n_jobs = _number_workers(n_jobs)
+    model = load_model(model_path)
+    scored: "Queue[Optional[Future]]" = Queue(maxsize=2 * n_jobs)
+    stop = Event()
+    writer = _PredictionWriter(output_path)
+    counts = {"read": 0, "written": 0}
+
+    with ThreadPoolExecutor(max_workers=n_jobs) as pool:
+
+        def submit(chunk: DataFrame) -> Future:
+            counts["read"] += len(chunk)
+            return pool.submit(
+                score_chunk, model, chunk, features, booleanized, keep_invalid
+            )
+
+        reader = Thread(
+            target=_read_and_submit,
+            args=(
+                read_chunks(input_path, sep, chunk_size, booleanized),
+                submit,
+                scored,
+                stop,
+            ),
+            daemon=True,
+        )
+        reader.start()
+        try:
+            while (future := scored.get()) is not None:
+                scores = future.result()
+                writer.write(scores)
+                counts["written"] += len(scores)
+        finally:
+            stop.set()
+            while reader.is_alive():
+                try:
+                    scored.get(timeout=0.1)
+                except Empty:
+                    pass
+            writer.close()
+    return counts
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("model", help="file saved by the save method of a model")
+    parser.add_argument("input", help="csv or parquet file of patients")
+    parser.add_argument("output", help="csv or parquet file of the predictions")
+    parser.add_argument("--sep", default=";", help="separator of the input csv")
+    parser.add_argument("--chunk-size", type=int, default=100_000)
+    parser.add_argument(
+        "--n-jobs",
+        type=int,
+        default=None,
+        help="number of scoring threads, -1 for all the cores (2 when omitted)",
+    )
+    parser.add_argument(
+        "--features",
+        default=",".join(MODEL_FEATURES),
+        help="comma separated Patient features the model was trained on",
+    )
+    parser.add_argument(
+        "--booleanized",
+        action="store_true",
+        help="the input has the filtered schema (booleans for gender and flags)",
+    )
+    parser.add_argument(
+        "--keep-invalid",
+        action="store_true",
+        help="score the invalid patients too, with an is_valid column",
+    )
+    arguments = parser.parse_args()
+    if arguments.n_jobs == 0:
+        parser.error("--n-jobs must be at least 1, or negative for all the cores")
+
+    counts = score_file(
+        arguments.model,
+        arguments.input,
+        arguments.output,
+        arguments.sep,
+        arguments.chunk_size,
+        arguments.n_jobs,
+        arguments.features.split(","),
+        arguments.booleanized,
+        arguments.keep_invalid,
+    )
+    print(f"{counts['written']} predictions written of {counts['read']} patients")
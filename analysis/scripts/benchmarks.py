@@ -0,0 +1,301 @@
+"""Benchmark suite of the custom estimators against their sklearn counterparts.
+
+Each model is fitted and scored on synthetic datasets (scripts.synthetic) of 10k and 100k rows by default (and 1M with
+--large, about 8 minutes more on one core, 4.5 of them the custom forest) and on the filtered dataset. For each one the
+suite measures the fit time, the predict throughput (rows/s) and the peak memory (tracemalloc) of the fit and of the
+predict, the times being the best of --repeat runs. The results are written as json and, given a baseline from a
+previous run, compared to it: a slower fit, a lower throughput or a higher peak memory of a custom model than the
+tolerance allows is reported as a regression and the command exits with 1 (the sklearn models are only references). All
+the models are seeded by --seed. The custom trees stop on depth > maximum_depth, so they are compared to sklearn trees
+of max_depth = maximum_depth + 1, with the same number of levels.
+
+tracemalloc only sees the allocations made through Python's allocators (numpy arrays included): the buffers sklearn
+allocates in its compiled code are missed, so the peak memories of the sklearn models are underestimated.
+
+Usage:
+    python -m scripts.benchmarks --output results.json
+    python -m scripts.benchmarks --sizes 10000 100000 --baseline results.json
+"""
+
+from argparse import ArgumentParser
+from json import dump, load
+from os import cpu_count
+from platform import platform, python_version
+from time import perf_counter
+from tracemalloc import get_traced_memory, start, stop
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from warnings import simplefilter
+
+import sklearn
+from logistic_regression.linear_model import CustomLogisticRegression
+from numpy import __version__ as numpy_version
+from numpy import mean, ndarray
+from numpy.random import default_rng
+from pandas import DataFrame
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.exceptions import ConvergenceWarning
+from sklearn.linear_model import LogisticRegression
+from sklearn.tree import DecisionTreeClassifier
+from tree_models.decision_tree import CustomDecisionTree
+from tree_models.random_forest import CustomRandomForest
+
+from scripts.create_patient import CARDIO_STR, ID_STR
+from scripts.generic_methods import (
+    BOOLEANIZED_CARDIO_DTYPES,
+    CARDIO_DTYPES,
+    _booleanize_dataset,
+    load_dataset,
+)
+from scripts.synthetic import SOURCE_PATH, CardioDistribution, fit_distribution, sample
+
+SIZES: Tuple[int, ...] = (10_000, 100_000)
+LARGE_SIZE = 1_000_000
+# CustomDecisionTree stops on depth > maximum_depth, so its trees have one
+# more level than the sklearn ones of the same max_depth
+TREE_DEPTH = 8
+FILTERED_PATH = "../data/filtered/cardio_train.csv"
+
+# name: (constructor from a seed, fit parameters), the sklearn counterpart of
+# each custom model with the same hyperparameters (the same number of levels)
+MODELS: Dict[str, Tuple[Callable[[int], Any], Dict[str, Any]]] = {
+    "custom_logistic_regression": (
+        lambda seed: CustomLogisticRegression(),
+        {"solver": "lbfgs", "max_iterations": 100},
+    ),
+    "sklearn_logistic_regression": (
+        lambda seed: LogisticRegression(max_iter=100),
+        {},
+    ),
+    "custom_decision_tree": (
+        lambda seed: CustomDecisionTree(maximum_depth=TREE_DEPTH, random_state=seed),
+        {},
+    ),
+    "sklearn_decision_tree": (
+        lambda seed: DecisionTreeClassifier(
+            max_depth=TREE_DEPTH + 1, random_state=seed
+        ),
+        {},
+    ),
+    "custom_random_forest": (
+        lambda seed: CustomRandomForest(
+            number_trees=20, maximum_depth=TREE_DEPTH, random_state=seed
+        ),
+        {},
+    ),
+    "sklearn_random_forest": (
+        lambda seed: RandomForestClassifier(
+            n_estimators=20, max_depth=TREE_DEPTH + 1, random_state=seed
+        ),
+        {},
+    ),
+}
+# prefix of the models whose regressions fail the comparison
+CUSTOM_PREFIX = "custom_"
+# measures where a higher value is a regression, the others being throughputs
+_COSTS = ("fit_seconds", "fit_peak_bytes", "predict_peak_bytes")
+_THROUGHPUTS = ("predict_rows_per_second",)
+
+
+def synthetic_dataset(
+    distribution: CardioDistribution, number_rows: int, seed: int = 0
+) -> DataFrame:
+    """Dataset of number_rows synthetic patients of the booleanized schema"""
+    return _booleanize_dataset(
+        sample(distribution, number_rows, [seed], 0).astype(CARDIO_DTYPES)
+    )
+
+
+def to_matrix(dataset: DataFrame) -> Tuple[ndarray, ndarray]:
+    """Float matrix of all the columns but the id and the target, as
+    tree_models.benchmark reads them, and the labels"""
+    features = dataset.drop(columns=[ID_STR, CARDIO_STR])
+    return features.to_numpy(dtype=float), dataset[CARDIO_STR].to_numpy(dtype=int)
+
+
+def _seconds(call: Callable[[], Any], repeat: int) -> float:
+    """Best duration of repeat calls"""
+    durations = []
+    for _ in range(repeat):
+        begin = perf_counter()
+        call()
+        durations.append(perf_counter() - begin)
+    return min(durations)
+
+
+def _peak_bytes(call: Callable[[], Any]) -> Tuple[int, Any]:
+    """Peak of the memory allocated during a call (numpy arrays included,
+    not the mallocs of compiled extensions), and its result"""
+    start()
+    try:
+        result = call()
+        return get_traced_memory()[1], result
+    finally:
+        stop()
+
+
+def benchmark_model(
+    name: str,
+    train: Tuple[ndarray, ndarray],
+    test: Tuple[ndarray, ndarray],
+    repeat: int = 3,
+    seed: int = 0,
+) -> Dict[str, float]:
+    """Fit time, predict throughput, peak memories and test accuracy of a
+    model of MODELS built from seed; the times are the best of repeat runs,
+    measured without tracemalloc, whose hooks slow the allocations down"""
+    constructor, fit_parameters = MODELS[name]
+
+    def fit() -> Any:
+        model = constructor(seed)
+        model.fit(*train, **fit_parameters)
+        return model
+
+    fit_seconds = _seconds(fit, repeat)
+    fit_peak_bytes, model = _peak_bytes(fit)
+    predict_seconds = _seconds(lambda: model.predict(test[0]), repeat)
+    predict_peak_bytes, predictions = _peak_bytes(lambda: model.predict(test[0]))
+    return {
+        "fit_seconds": fit_seconds,
+        "fit_peak_bytes": fit_peak_bytes,
+        "predict_rows_per_second": len(test[0]) / predict_seconds,
+        "predict_peak_bytes": predict_peak_bytes,
+        "accuracy": float(mean(predictions.ravel() == test[1])),
+    }
+
+
+def benchmark_datasets(
+    sizes: Sequence[int] = SIZES,
+    models: Sequence[str] = tuple(MODELS),
+    repeat: int = 3,
+    seed: int = 0,
+) -> List[Dict[str, Any]]:
+    """Results of the models on the synthetic datasets of each size and on
+    the filtered dataset, each split 80% train / 20% test"""
+    distribution = fit_distribution(load_dataset(SOURCE_PATH, ";"), seed)
+    datasets = {
+        f"synthetic_{size}": synthetic_dataset(distribution, size, seed)
+        for size in sizes
+    }
+    datasets["filtered"] = load_dataset(
+        FILTERED_PATH, ",", dtypes=BOOLEANIZED_CARDIO_DTYPES
+    )
+
+    results = []
+    for dataset_name, dataset in datasets.items():
+        dataframe, target_values = to_matrix(dataset)
+        order = default_rng(seed).permutation(len(target_values))
+        train, test = order[: int(0.8 * len(order))], order[int(0.8 * len(order)) :]
+        for name in models:
+            results.append(
+                {
+                    "dataset": dataset_name,
+                    "rows": len(target_values),
+                    "model": name,
+                    **benchmark_model(
+                        name,
+                        (dataframe[train], target_values[train]),
+                        (dataframe[test], target_values[test]),
+                        repeat,
+                        seed,
+                    ),
+                }
+            )
+    return results
+
+
+def environment() -> Dict[str, Any]:
+    """Versions and machine the results were measured with"""
+    return {
+        "python": python_version(),
+        "numpy": numpy_version,
+        "sklearn": sklearn.__version__,
+        "platform": platform(),
+        "cpu_count": cpu_count(),
+    }
+
+
+def compare(
+    results: List[Dict[str, Any]],
+    baseline: List[Dict[str, Any]],
+    tolerance: float = 0.2,
+) -> List[str]:
+    """Regressions of the custom models against the baseline, measure by
+    measure: a cost above (1 + tolerance) times the baseline, or a throughput
+    below the baseline divided by (1 + tolerance)"""
+    baseline_results = {
+        (result["dataset"], result["model"]): result for result in baseline
+    }
+    regressions = []
+    for result in results:
+        reference = baseline_results.get((result["dataset"], result["model"]))
+        if reference is None or not result["model"].startswith(CUSTOM_PREFIX):
+            continue
+        for measure in _COSTS + _THROUGHPUTS:
+            ratio = result[measure] / reference[measure] if reference[measure] else 1.0
+            if (measure in _COSTS and ratio > 1 + tolerance) or (
+                measure in _THROUGHPUTS and ratio < 1 / (1 + tolerance)
+            ):
+                regressions.append(
+                    f"{result['dataset']} {result['model']} {measure}: "
+                    f"{reference[measure]:.4g} -> {result[measure]:.4g} ({ratio:.2f}x)"
+                )
+    return regressions
+
+
+def _report(results: List[Dict[str, Any]]) -> str:
+    """Table of the results, the models of a dataset side by side"""
+    lines = [
+        f"{'dataset':<18}{'model':<30}{'fit s':>9}{'fit MB':>9}"
+        f"{'predict rows/s':>16}{'predict MB':>12}{'accuracy':>10}"
+    ]
+    for result in results:
+        lines.append(
+            f"{result['dataset']:<18}{result['model']:<30}"
+            f"{result['fit_seconds']:>9.3f}{result['fit_peak_bytes'] / 2**20:>9.1f}"
+            f"{result['predict_rows_per_second']:>16,.0f}"
+            f"{result['predict_peak_bytes'] / 2**20:>12.1f}{result['accuracy']:>10.4f}"
+        )
+    return "\n".join(lines)
+
+
+def main(arguments: Optional[Sequence[str]] = None) -> int:
+    """Run the suite, write the results, and compare them to the baseline"""
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="*", default=list(SIZES))
+    parser.add_argument(
+        "--large",
+        action="store_true",
+        help=f"add a synthetic dataset of {LARGE_SIZE} rows (about 8 minutes more)",
+    )
+    parser.add_argument(
+        "--models", nargs="+", choices=list(MODELS), default=list(MODELS)
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="the times are the best of repeat runs"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline", help="results json of a previous run")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parsed = parser.parse_args(arguments)
+    # both logistic regressions are capped at the same number of iterations
+    simplefilter("ignore", ConvergenceWarning)
+
+    sizes = parsed.sizes + [LARGE_SIZE] * parsed.large
+    results = benchmark_datasets(sizes, parsed.models, parsed.repeat, parsed.seed)
+    with open(parsed.output, "w") as file:
+        dump({"environment": environment(), "results": results}, file, indent=2)
+    print(_report(results))
+    print("peak memories from tracemalloc, without the mallocs of sklearn's compiled code")
+
+    if parsed.baseline is None:
+        return 0
+    with open(parsed.baseline) as file:
+        regressions = compare(results, load(file)["results"], parsed.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
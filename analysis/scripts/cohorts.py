@@ -0,0 +1,114 @@
+"""Counts of patients and of cardio cases per cohort, in a single pass"""
+
+from enum import Enum
+from typing import Dict, Iterable, List, Sequence, Tuple, Type, Union
+
+from numpy import array, bincount, ndarray, ravel_multi_index, where
+from pandas import DataFrame, MultiIndex
+
+from scripts.bmi import AgeGroup, BmiLevel
+from scripts.create_patient import CARDIO_STR, CHOLESTEROL_STR, GLUC_STR, LVL_MAP
+from scripts.definitions import ApHighLevel, ApLowLevel, CholesterolLevel, GlucLevel
+from scripts.patient import Gender, Patient
+from scripts.patient_frame import MISSING_CODE, PatientFrame
+
+TOTAL_STR = "total"
+CARDIO_COUNT_STR = "cardio"
+
+DIMENSIONS: Dict[str, Type[Enum]] = {
+    "bmi_status": BmiLevel,
+    "age_group": AgeGroup,
+    "broader_age_group": AgeGroup,
+    "ap_hi_status": ApHighLevel,
+    "ap_lo_status": ApLowLevel,
+    "gender": Gender,
+    "cholesterol": CholesterolLevel,
+    "gluc": GlucLevel,
+}
+
+_LEVEL_COLUMNS: Dict[str, str] = {"cholesterol": CHOLESTEROL_STR, "gluc": GLUC_STR}
+
+
+def _frame_codes(patients: PatientFrame, dimensions: Sequence[str]) -> ndarray:
+    """(patients x dimensions) integer codes read from the categorical columns"""
+    columns = []
+    for dimension in dimensions:
+        if dimension in _LEVEL_COLUMNS:
+            levels = patients.dataset[_LEVEL_COLUMNS[dimension]].to_numpy()
+            known = (levels >= min(LVL_MAP)) & (levels <= max(LVL_MAP))
+            columns.append(where(known, levels - min(LVL_MAP), MISSING_CODE))
+        else:
+            columns.append(getattr(patients, dimension).cat.codes.to_numpy())
+    return array(columns, dtype=int).T.reshape(len(patients.index), len(dimensions))
+
+
+def _patient_codes(
+    patients: List[Patient], dimensions: Sequence[str]
+) -> Tuple[ndarray, ndarray]:
+    """(patients x dimensions) integer codes and cardio flags, in one walk"""
+    code_by_member = {
+        dimension: {member: code for code, member in enumerate(DIMENSIONS[dimension])}
+        for dimension in dimensions
+    }
+    codes = array(
+        [
+            [
+                code_by_member[dimension][getattr(patient, dimension)]
+                for dimension in dimensions
+            ]
+            for patient in patients
+        ],
+        dtype=int,
+    ).reshape(len(patients), len(dimensions))
+    cardio = array([patient.cardio for patient in patients], dtype=bool)
+    return codes, cardio
+
+
+def count_cohorts(
+    patients: Union[PatientFrame, List[Patient]], dimensions: Sequence[str]
+) -> DataFrame:
+    """Count the patients and the cardio cases of every combination of the
+    dimensions (keys of DIMENSIONS), e.g. ["bmi_status"] or the cross-tab
+    ["broader_age_group", "gender"]
+    The combinations are encoded as one integer and counted by a bincount;
+    patients with a missing category (see PatientFrame) are left out.
+    Returns a DataFrame indexed by the enum members, every combination
+    present, with the columns total and cardio
+    """
+    unknown = [dimension for dimension in dimensions if dimension not in DIMENSIONS]
+    if unknown or not dimensions:
+        raise ValueError(f"Dimensions must be among {list(DIMENSIONS)}, got {unknown}")
+
+    if isinstance(patients, PatientFrame):
+        codes = _frame_codes(patients, dimensions)
+        cardio = patients.dataset[CARDIO_STR].to_numpy(dtype=bool)
+    else:
+        codes, cardio = _patient_codes(patients, dimensions)
+
+    shape = tuple(len(DIMENSIONS[dimension]) for dimension in dimensions)
+    known = (codes != MISSING_CODE).all(axis=1)
+    cohorts = ravel_multi_index(tuple(codes[known].T), shape)
+    totals = bincount(cohorts, minlength=array(shape).prod())
+    cardio_counts = bincount(
+        cohorts, weights=cardio[known], minlength=array(shape).prod()
+    ).astype(int)
+
+    index = MultiIndex.from_product(
+        [list(DIMENSIONS[dimension]) for dimension in dimensions], names=dimensions
+    )
+    return DataFrame(
+        {TOTAL_STR: totals, CARDIO_COUNT_STR: cardio_counts},
+        index=index if len(dimensions) > 1 else index.get_level_values(0),
+    )
+
+
+def to_counts(
+    cohorts: DataFrame, excluded: Iterable[Enum] = ()
+) -> tuple[Dict[Enum, int], Dict[Enum, int]]:
+    """Totals and cardio counts of a single dimension count_cohorts as the
+    pair of dicts plot_counts takes, without the excluded members"""
+    kept = cohorts.drop(index=list(excluded))
+    return (
+        dict(zip(kept.index, kept[TOTAL_STR].tolist())),
+        dict(zip(kept.index, kept[CARDIO_COUNT_STR].tolist())),
+    )
@@ -1,5 +1,8 @@
-from typing import Any, Dict
-from pandas import Series
+from concurrent.futures import ProcessPoolExecutor
+from os import cpu_count
+from typing import Any, Dict, List, Optional
+from pandas import DataFrame, Series
+from pydantic import TypeAdapter
 from scripts.definitions import CholesterolLevel, GlucLevel
 from scripts.patient import Patient
 
@@ -19,6 +22,24 @@ GLUC_STR = "gluc"
 
 LVL_MAP: Dict[int, str] = {1: "NORMAL", 2: "ABOVE_NORMAL", 3: "WELL_ABOVE_NORMAL"}
 
+PATIENT_FIELDS: Dict[str, str] = {
+    ID_STR: "id",
+    GENDER_STR: "sex",
+    AGE_STR: "age",
+    HEIGHT_STR: "height",
+    WEIGHT_STR: "weight",
+    AP_LO_STR: "ap_lo",
+    AP_HI_STR: "ap_hi",
+    CHOLESTEROL_STR: "cholesterol",
+    GLUC_STR: "gluc",
+    SMOKE_STR: "smoke",
+    ALCO_STR: "alco",
+    ACTIVE_STR: "active",
+    CARDIO_STR: "cardio",
+}
+
+_PATIENTS_ADAPTER = TypeAdapter(List[Patient])
+
 
 def create_patient(data_row: Series) -> Patient:
     """Abstraction of creating patient from data_row"""
@@ -37,3 +58,83 @@ def create_patient(data_row: Series) -> Patient:
         active=data_row[ACTIVE_STR],
         cardio=data_row[CARDIO_STR],
     )
+
+
+def _patient_records(dataset: DataFrame) -> List[Dict[str, Any]]:
+    """Rows of the dataset as Patient keyword arguments, levels mapped to enums"""
+    frame = dataset[list(PATIENT_FIELDS)].rename(columns=PATIENT_FIELDS)
+    frame["cholesterol"] = [
+        CholesterolLevel[LVL_MAP[level]] for level in frame["cholesterol"]
+    ]
+    frame["gluc"] = [GlucLevel[LVL_MAP[level]] for level in frame["gluc"]]
+    return frame.to_dict("records")
+
+
+def _create_patient_chunk(
+    records: List[Dict[str, Any]], validate: bool
+) -> List[Patient]:
+    """Build the patients of one chunk, validated in a single pydantic call
+    or constructed without validation for trusted data"""
+    if validate:
+        return _PATIENTS_ADAPTER.validate_python(records)
+    return [Patient.model_construct(**record) for record in records]
+
+
+_DATASET: Optional[DataFrame] = None
+
+
+def _set_dataset(dataset: DataFrame) -> None:
+    """Initializer of the workers, to send the dataset only once"""
+    global _DATASET
+    _DATASET = dataset
+
+
+def _create_patient_range(start: int, end: int, validate: bool) -> List[Patient]:
+    """Build the patients of the rows [start, end) of the worker dataset"""
+    return _create_patient_chunk(
+        _patient_records(_DATASET.iloc[start:end]), validate
+    )
+
+
+def create_patients(
+    dataset: DataFrame,
+    chunk_size: int = 10_000,
+    n_jobs: Optional[int] = None,
+    validate: bool = True,
+) -> List[Patient]:
+    """Bulk version of create_patient, one Patient per row in the dataset order
+    The rows are split in chunks of chunk_size, built in a pool of n_jobs
+    processes (all the cores for -1, in process for None or 0): the workers
+    get the dataset once and build the chunks of their row ranges
+    The pool does not make it faster: the Patient objects it sends back
+    take longer to pickle and unpickle than to build (about 0.8s for the
+    59k filtered rows, the same as the whole in process run)
+    Without validate, Patient.model_construct skips the pydantic checks:
+    only for datasets already cleaned and booleanized
+    """
+    if not n_jobs:
+        records = _patient_records(dataset)
+        return [
+            patient
+            for start in range(0, len(records), chunk_size)
+            for patient in _create_patient_chunk(
+                records[start : start + chunk_size], validate
+            )
+        ]
+
+    starts = list(range(0, len(dataset), chunk_size))
+    with ProcessPoolExecutor(
+        max_workers=(cpu_count() or 1) if n_jobs < 0 else n_jobs,
+        initializer=_set_dataset,
+        initargs=(dataset[list(PATIENT_FIELDS)],),
+    ) as executor:
+        return [
+            patient
+            for patients in executor.map(
+                _create_patient_range,
+                starts,
+                [start + chunk_size for start in starts],
+                [validate] * len(starts),
+            )
+            for patient in patients
+        ]
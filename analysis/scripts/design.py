@@ -0,0 +1,121 @@
+"""Design matrix of the models, from rows in the cardio_train.csv schema"""
+
+from typing import Any, Dict, List, Sequence, Tuple
+
+from numpy import (
+    array,
+    column_stack,
+    float64,
+    floor,
+    iinfo,
+    isfinite,
+    ndarray,
+)
+from numpy import dtype as numpy_dtype
+from pandas import CategoricalDtype, DataFrame
+
+from scripts.create_patient import CARDIO_STR, ID_STR
+from scripts.generic_methods import CARDIO_DTYPES, _booleanize_dataset
+from scripts.patient_frame import PatientFrame
+
+MODEL_FEATURES: List[str] = ["is_healthy", "ap_lo", "gluc"]
+
+# columns a patient to score does not need to have
+_OPTIONAL_COLUMNS: Dict[str, Any] = {ID_STR: 0, CARDIO_STR: 0}
+
+
+def _record_column(values: List[Any], column: str, dtype: str) -> ndarray:
+    """Column of the values of a field, checked instead of being truncated or
+    wrapped around by the cast to its dtype
+    Raises a ValueError when a value is not a finite number, or not an
+    integer in the range of an integer dtype"""
+    numbers = array(values, dtype=float64)
+    if not isfinite(numbers).all():
+        raise ValueError(f"{column} has values which are not finite numbers")
+    kind = numpy_dtype(dtype).kind
+    if kind in "biu" and (numbers != floor(numbers)).any():
+        raise ValueError(f"{column} has values which are not integers")
+    if kind in "iu":
+        bounds = iinfo(dtype)
+        if ((numbers < bounds.min) | (numbers > bounds.max)).any():
+            raise ValueError(f"{column} has values out of the range of {dtype}")
+    return numbers.astype(dtype)
+
+
+def records_to_dataset(records: Sequence[Dict[str, Any]]) -> DataFrame:
+    """Dataset of the original csv schema from json records, the id and the
+    cardio columns being optional
+    Raises a ValueError when a field is missing or not a number of its type"""
+    try:
+        return DataFrame(
+            {
+                column: _record_column(
+                    [
+                        record.get(column, _OPTIONAL_COLUMNS[column])
+                        if column in _OPTIONAL_COLUMNS
+                        else record[column]
+                        for record in records
+                    ],
+                    column,
+                    dtype,
+                )
+                for column, dtype in CARDIO_DTYPES.items()
+            }
+        )
+    except KeyError as error:
+        raise ValueError(f"Patients without the field {error}")
+    except (OverflowError, TypeError, ValueError) as error:
+        raise ValueError(f"Patients not in the cardio_train schema: {error}")
+
+
+def _columns(
+    frame: DataFrame, features: Sequence[str]
+) -> Tuple[List[ndarray], List[str]]:
+    """Columns of the design matrix and their names, the categorical features
+    one-hot encoded on all the members of their enum"""
+    columns, names = [], []
+    for feature in features:
+        column = frame[feature]
+        if isinstance(column.dtype, CategoricalDtype):
+            codes = column.cat.codes.to_numpy()
+            for code, category in enumerate(column.cat.categories):
+                columns.append(codes == code)
+                names.append(f"{feature}_{category}")
+        else:
+            columns.append(column.to_numpy(dtype=float))
+            names.append(feature)
+    return columns, names
+
+
+def encode_features(frame: DataFrame, features: Sequence[str]) -> ndarray:
+    """Float (patients x columns) matrix of features of a
+    PatientFrame.to_dataframe, a category missing for an invalid patient
+    having all its columns at 0"""
+    columns, _ = _columns(frame, features)
+    return column_stack(columns).astype(float)
+
+
+def patient_frame(dataset: DataFrame, booleanized: bool = False) -> PatientFrame:
+    """PatientFrame of rows of the original csv (gender 1/2, flags 0/1), or of
+    the filtered one when booleanized; the dataset is not modified"""
+    if not booleanized:
+        dataset = _booleanize_dataset(dataset.copy())
+    return PatientFrame(dataset)
+
+
+def design_matrix(
+    dataset: DataFrame,
+    features: Sequence[str] = MODEL_FEATURES,
+    booleanized: bool = False,
+) -> ndarray:
+    """Float (patients x columns) matrix of the features, derived from the
+    rows as Patient derives them (see encode_features)"""
+    return encode_features(
+        patient_frame(dataset, booleanized).to_dataframe(features), features
+    )
+
+
+def feature_names(features: Sequence[str] = MODEL_FEATURES) -> List[str]:
+    """Names of the columns of design_matrix"""
+    frame = patient_frame(records_to_dataset([])).to_dataframe(features)
+    return _columns(frame, features)[1]
@@ -1,32 +1,92 @@
 """Colletion of methods to convert and filter the dataset"""
 
+from hashlib import sha256
+from importlib import import_module
+from importlib.util import find_spec
+from json import dumps, loads
+from os import replace
 from pathlib import Path
-from typing import Callable
-from pandas import DataFrame, read_csv
+from typing import IO, Any, Callable, Dict, Iterator, List, Optional
+from numpy import asarray, fromiter, ndarray
+from pandas import DataFrame, Series, read_csv
 
 from scripts.create_patient import (
     ACTIVE_STR,
+    AGE_STR,
     ALCO_STR,
+    AP_HI_STR,
+    AP_LO_STR,
     CARDIO_STR,
+    CHOLESTEROL_STR,
     GENDER_STR,
+    GLUC_STR,
+    HEIGHT_STR,
+    ID_STR,
     SMOKE_STR,
+    WEIGHT_STR,
     create_patient,
 )
 from scripts.patient import Patient
+from scripts.patient_frame import PatientFrame
 
+# weight stays float64: some weights are not exact in float32, which would
+# change the rounded bmi
+CARDIO_DTYPES: Dict[str, str] = {
+    ID_STR: "int32",
+    AGE_STR: "int32",
+    GENDER_STR: "uint8",
+    HEIGHT_STR: "int16",
+    WEIGHT_STR: "float64",
+    AP_HI_STR: "int16",
+    AP_LO_STR: "int16",
+    CHOLESTEROL_STR: "uint8",
+    GLUC_STR: "uint8",
+    SMOKE_STR: "bool",
+    ALCO_STR: "bool",
+    ACTIVE_STR: "bool",
+    CARDIO_STR: "bool",
+}
+BOOLEANIZED_CARDIO_DTYPES: Dict[str, str] = {**CARDIO_DTYPES, GENDER_STR: "bool"}
 
-def load_dataset(path: str | Path, sep: str) -> DataFrame:
-    dataset = read_csv(path, sep=sep)
-    return dataset
+_BOOLEAN_COLUMNS = [SMOKE_STR, ALCO_STR, ACTIVE_STR, CARDIO_STR]
+
+CACHE_SUFFIX = ".feather"
+_CACHE_KEY = b"cache_key"
+_HASH_BLOCK_SIZE = 1 << 20
+
+
+def load_dataset(
+    path: str | Path | IO[bytes],
+    sep: str,
+    chunk_size: Optional[int] = None,
+    dtypes: Optional[Dict[str, str]] = None,
+) -> DataFrame | Iterator[DataFrame]:
+    """Method to load a dataset
+    With a chunk_size, returns an iterator of DataFrames of chunk_size rows
+    instead of loading the whole file in memory
+    With dtypes (CARDIO_DTYPES for the original csv, BOOLEANIZED_CARDIO_DTYPES
+    for the filtered one), the columns are parsed directly in these types,
+    by the pyarrow engine when it is installed and the file read at once
+    """
+    if dtypes is None:
+        return read_csv(path, sep=sep, chunksize=chunk_size)
+    engine = "pyarrow" if chunk_size is None and find_spec("pyarrow") else "c"
+    header = read_csv(path, sep=sep, nrows=0).columns
+    if hasattr(path, "seek"):
+        path.seek(0)
+    return read_csv(
+        path,
+        sep=sep,
+        chunksize=chunk_size,
+        engine=engine,
+        dtype={column: dtypes[column] for column in header if column in dtypes},
+    )
 
 
 def _booleanize_dataset(dataset: DataFrame) -> DataFrame:
     """Method to convert dataset to boolean values"""
-    dataset[GENDER_STR] = dataset[GENDER_STR].apply(lambda x: bool(x - 1))
-    dataset[SMOKE_STR] = dataset[SMOKE_STR].apply(lambda x: bool(x))
-    dataset[ALCO_STR] = dataset[ALCO_STR].apply(lambda x: bool(x))
-    dataset[ACTIVE_STR] = dataset[ACTIVE_STR].apply(lambda x: bool(x))
-    dataset[CARDIO_STR] = dataset[CARDIO_STR].apply(lambda x: bool(x))
+    dataset[GENDER_STR] = dataset[GENDER_STR].to_numpy() != 1
+    dataset[_BOOLEAN_COLUMNS] = dataset[_BOOLEAN_COLUMNS].to_numpy() != 0
     return dataset
 
 
@@ -37,14 +97,157 @@ def _save_compatible_dataset(dataset: DataFrame) -> None:
     comp_dataset.to_csv(comp_dataset_path, sep=";", index=False)
 
 
-def drop_by_filter(dataset: DataFrame, filter: Callable[[Patient], bool]) -> DataFrame:
+def _patient_mask(dataset: DataFrame, filter: Callable[[Patient], bool]) -> ndarray:
+    """Method to evaluate a Patient predicate on every row into a boolean mask
+    The rows are read as records, without building a Series per row
+    """
+    return fromiter(
+        (bool(filter(create_patient(row))) for row in dataset.to_dict("records")),
+        dtype=bool,
+        count=len(dataset),
+    )
+
+
+def drop_by_filter(
+    dataset: DataFrame,
+    filter: Callable[[Patient], bool] | Callable[[PatientFrame], Series],
+    vectorized: bool = False,
+) -> DataFrame:
     """Method to filter dataset
     Pass a function that takes a Patient object and returns a boolean value
     All patients that return True will be removed from the dataset
+    With vectorized, the function takes a PatientFrame and returns a boolean
+    column instead, e.g. lambda patients: ~patients.is_valid
+    The rows are dropped at once with a boolean mask
+    """
+    if vectorized:
+        mask = asarray(filter(PatientFrame(dataset)), dtype=bool)
+    else:
+        mask = _patient_mask(dataset, filter)
+    return dataset[~mask].copy()
+
+
+def _content_hash(path: Path, size: Optional[int] = None) -> str:
+    """Method to hash the content of a file (its first size bytes), by blocks"""
+    digest = sha256()
+    remaining = size
+    with open(path, "rb") as file:
+        while remaining is None or remaining > 0:
+            block = file.read(
+                _HASH_BLOCK_SIZE
+                if remaining is None
+                else min(_HASH_BLOCK_SIZE, remaining)
+            )
+            if not block:
+                break
+            digest.update(block)
+            if remaining is not None:
+                remaining -= len(block)
+    return digest.hexdigest()
+
+
+def _source_key(path: Path, previous: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Method to fingerprint an input of a cache
+    The content is hashed again only when the size or the mtime changed
+    """
+    stat = path.stat()
+    key = {"path": str(path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    if previous is not None and all(previous.get(name) == key[name] for name in key):
+        return previous
+    return {**key, "sha256": _content_hash(path)}
+
+
+def _read_cache(cache_path: Path) -> tuple[Optional[Any], Optional[Dict[str, Any]]]:
+    """Method to open a cache memory-mapped, with the key it was built with
+    A missing or unreadable cache is a miss"""
+    if not cache_path.exists():
+        return None, None
+    try:
+        table = import_module("pyarrow.feather").read_table(
+            cache_path, memory_map=True
+        )
+    except (OSError, ValueError):
+        return None, None
+    metadata = table.schema.metadata or {}
+    return table, loads(metadata[_CACHE_KEY]) if _CACHE_KEY in metadata else None
+
+
+def _write_cache(cache_path: Path, dataset: DataFrame, key: Dict[str, Any]) -> None:
+    """Method to save a dataset as uncompressed Feather (memory-mappable),
+    its key in the schema metadata
+    The file is written aside then renamed: the dataset may still be mapped
+    on the previous cache, which must not be truncated under it
+    """
+    pyarrow = import_module("pyarrow")
+    table = pyarrow.Table.from_pandas(dataset)
+    table = table.replace_schema_metadata(
+        {**(table.schema.metadata or {}), _CACHE_KEY: dumps(key)}
+    )
+    written_path = cache_path.with_name(f"{cache_path.name}.tmp")
+    import_module("pyarrow.feather").write_feather(
+        table, written_path, compression="uncompressed"
+    )
+    replace(written_path, cache_path)
+
+
+def _same_content(key: Dict[str, Any], previous_key: Dict[str, Any]) -> bool:
+    """Method to check if two cache keys only differ by the mtimes of the inputs"""
+    return key["parameters"] == previous_key.get("parameters") and [
+        source["sha256"] for source in key["inputs"]
+    ] == [source.get("sha256") for source in previous_key.get("inputs", [])]
+
+
+def cached_stage(
+    cache_path: str | Path,
+    inputs: List[str | Path],
+    build: Callable[[], DataFrame],
+    parameters: Optional[Dict[str, Any]] = None,
+) -> DataFrame:
+    """Method to get a dataset derived from files, rebuilt only when needed
+    build is called, and its result saved in cache_path, only when the
+    content of one of the inputs or the parameters changed since the last
+    build (a change in the code of build must be reflected in parameters)
+    Without pyarrow, build is always called
+    """
+    if find_spec("pyarrow") is None:
+        return build()
+    cache_path = Path(cache_path)
+    table, previous_key = _read_cache(cache_path)
+    previous_sources = (previous_key or {}).get("inputs", [])
+
+    key = {
+        "parameters": parameters or {},
+        "inputs": [
+            _source_key(
+                Path(path),
+                previous_sources[position] if position < len(previous_sources) else None,
+            )
+            for position, path in enumerate(inputs)
+        ],
+    }
+    if table is not None and key == previous_key:
+        return table.to_pandas()
+
+    if table is not None and previous_key is not None and _same_content(
+        key, previous_key
+    ):
+        dataset = table.to_pandas()
+    else:
+        dataset = build()
+    _write_cache(cache_path, dataset, key)
+    return dataset
+
+
+def load_cached_dataset(
+    path: str | Path, sep: str, dtypes: Optional[Dict[str, str]] = None
+) -> DataFrame:
+    """Method to load a dataset through a Feather cache next to the csv
+    The csv is parsed again only when its content changed
     """
-    new_dataset = dataset.copy()
-    for index, patient_row in new_dataset.iterrows():
-        patient = create_patient(patient_row)
-        if filter(patient):
-            new_dataset = new_dataset.drop(index)
-    return new_dataset
+    path = Path(path)
+    return cached_stage(
+        path.with_suffix(CACHE_SUFFIX),
+        [path],
+        lambda: load_dataset(path, sep, dtypes=dtypes),
+        parameters={"sep": sep, "dtypes": dtypes},
+    )
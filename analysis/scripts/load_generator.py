@@ -0,0 +1,134 @@
+"""Load generator of the scoring server, reporting its latency percentiles and throughput.
+
+Concurrent clients, each on its own keep-alive connection, post patients drawn from a csv of the cardio_train.csv
+schema to POST /score as fast as the server answers them.
+
+Usage:
+    python -m scripts.load_generator ../data/original/cardio_train.csv --port 8000 --concurrency 64
+"""
+
+from argparse import ArgumentParser
+from asyncio import gather, open_connection, run
+from json import dumps
+from time import perf_counter
+from typing import Any, Dict, List
+
+from numpy import array, percentile
+from numpy.random import default_rng
+
+from scripts.generic_methods import CARDIO_DTYPES, load_dataset
+
+PERCENTILES = (50, 90, 99)
+
+
+def _requests(
+    path: str, sep: str, number_requests: int, rows_per_request: int, seed: int
+) -> List[bytes]:
+    """Bodies of the requests, random patients of the csv"""
+    dataset = load_dataset(path, sep, dtypes=CARDIO_DTYPES)
+    records = dataset.drop(columns=["cardio"]).to_dict("records")
+    rows = default_rng(seed).integers(
+        0, len(records), (number_requests, rows_per_request)
+    )
+    return [
+        dumps([records[row] for row in request_rows]).encode()
+        for request_rows in rows.tolist()
+    ]
+
+
+async def _client(
+    host: str, port: int, bodies: List[bytes], latencies: List[float]
+) -> int:
+    """Post the bodies one after the other, appending each latency, and
+    return the number of requests which failed"""
+    reader, writer = await open_connection(host, port)
+    failures = 0
+    try:
+        for body in bodies:
+            start = perf_counter()
+            writer.write(
+                (
+                    f"POST /score HTTP/1.1\r\nHost: {host}\r\n"
+                    "Content-Type: application/json\r\n"
+                    f"Content-Length: {len(body)}\r\n\r\n"
+                ).encode()
+                + body
+            )
+            head = await reader.readuntil(b"\r\n\r\n")
+            lines = head.decode("latin-1").split("\r\n")
+            length = next(
+                int(line.partition(":")[2])
+                for line in lines
+                if line.lower().startswith("content-length:")
+            )
+            await reader.readexactly(length)
+            latencies.append(perf_counter() - start)
+            failures += lines[0].split(" ", 2)[1] != "200"
+    finally:
+        writer.close()
+    return failures
+
+
+async def generate_load(
+    host: str, port: int, bodies: List[bytes], concurrency: int
+) -> Dict[str, Any]:
+    """Latency percentiles (ms), throughput and failures of the bodies sent
+    by concurrency clients"""
+    latencies: List[float] = []
+    start = perf_counter()
+    failures = await gather(
+        *(
+            _client(host, port, bodies[client::concurrency], latencies)
+            for client in range(concurrency)
+        )
+    )
+    elapsed = perf_counter() - start
+    milliseconds = array(latencies) * 1000
+    return {
+        "requests": len(latencies),
+        "failures": sum(failures),
+        "seconds": elapsed,
+        "requests_per_second": len(latencies) / elapsed,
+        **{
+            f"p{rank}_ms": float(percentile(milliseconds, rank))
+            for rank in PERCENTILES
+        },
+        "max_ms": float(milliseconds.max()),
+    }
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", help="csv file in the cardio_train schema")
+    parser.add_argument("--sep", default=";")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=10_000)
+    parser.add_argument("--rows-per-request", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    arguments = parser.parse_args()
+
+    report = run(
+        generate_load(
+            arguments.host,
+            arguments.port,
+            _requests(
+                arguments.path,
+                arguments.sep,
+                arguments.requests,
+                arguments.rows_per_request,
+                arguments.seed,
+            ),
+            arguments.concurrency,
+        )
+    )
+    print(
+        f"{report['requests']} requests ({report['failures']} failed)"
+        f" in {report['seconds']:.2f}s: {report['requests_per_second']:.0f} requests/s"
+    )
+    print(
+        "latency "
+        + "  ".join(f"p{rank} {report[f'p{rank}_ms']:.2f}ms" for rank in PERCENTILES)
+        + f"  max {report['max_ms']:.2f}ms"
+    )
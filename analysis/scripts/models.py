@@ -0,0 +1,46 @@
+"""Loading and scoring of the saved models of logistic_regression and tree_models"""
+
+from json import loads
+from pathlib import Path
+from typing import Any
+
+from logistic_regression.linear_model import MAGIC as LOGISTIC_REGRESSION_MAGIC
+from logistic_regression.linear_model import CustomLogisticRegression
+from numpy import ndarray
+from tree_models.decision_tree import CustomDecisionTree
+from tree_models.gradient_boosting import CustomGradientBoosting
+from tree_models.model_file import MAGIC as TREE_MODELS_MAGIC
+from tree_models.random_forest import CustomRandomForest
+
+TREE_MODELS = {
+    model.__name__: model
+    for model in (CustomDecisionTree, CustomRandomForest, CustomGradientBoosting)
+}
+
+
+def load_model(path: str | Path) -> Any:
+    """Saved CustomLogisticRegression or tree_models model, found from the
+    magic bytes of the file (and the name of the class in the tree_models
+    header)"""
+    with open(path, "rb") as file:
+        magic = file.read(len(TREE_MODELS_MAGIC))
+        if magic == LOGISTIC_REGRESSION_MAGIC:
+            return CustomLogisticRegression.load(path)
+        if magic != TREE_MODELS_MAGIC:
+            raise ValueError(f"{path} is not a saved model")
+        header_length = int.from_bytes(file.read(4), "little")
+        model_name = loads(file.read(header_length))["model"]
+    if model_name not in TREE_MODELS:
+        raise ValueError(f"{path} holds an unknown model {model_name}")
+    return TREE_MODELS[model_name].load(path)
+
+
+def positive_probability(model: Any, dataframe: ndarray) -> ndarray:
+    """Probability of cardio for each row, 0 or 1 for a model without
+    predict_proba (the decision tree only keeps the label of its leaves)"""
+    if not hasattr(model, "predict_proba"):
+        return model.predict(dataframe).astype(float)
+    probabilities = model.predict_proba(dataframe)
+    if probabilities.ndim == 2 and probabilities.shape[1] > 1:
+        return probabilities[:, 1]
+    return probabilities.ravel()
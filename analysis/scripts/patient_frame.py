@@ -0,0 +1,372 @@
+"""Columnar counterpart of the Patient model"""
+
+from enum import Enum
+from functools import cached_property
+from typing import Callable, Dict, List, Optional, Sequence, Type
+
+from numpy import (
+    array,
+    clip,
+    floor,
+    full,
+    isin,
+    ndarray,
+    round as round_array,
+    searchsorted,
+    trunc,
+    where,
+)
+from pandas import Categorical, DataFrame, Series
+
+from scripts.bmi import (
+    AGE_GROUP_REFERENCE,
+    AGE_GROUP_VALUES,
+    BMI_VALUES,
+    AgeGroup,
+    BmiLevel,
+)
+from scripts.create_patient import (
+    ACTIVE_STR,
+    AGE_STR,
+    ALCO_STR,
+    AP_HI_STR,
+    AP_LO_STR,
+    CARDIO_STR,
+    CHOLESTEROL_STR,
+    GENDER_STR,
+    GLUC_STR,
+    HEIGHT_STR,
+    ID_STR,
+    LVL_MAP,
+    SMOKE_STR,
+    WEIGHT_STR,
+)
+from scripts.definitions import (
+    AP_HIGH_VALUES,
+    AP_LOW_VALUES,
+    ApHighLevel,
+    ApLowLevel,
+    CholesterolLevel,
+    GlucLevel,
+)
+from scripts.patient import (
+    _ALLOWED_AGE,
+    _ALLOWED_BMI_PER_GROUP,
+    _ALLOWED_HEIGHT,
+    _ALLOWED_WEIGHT,
+    _DAY_TO_YEAR_RATIO,
+    Gender,
+)
+
+MISSING_CODE = -1
+
+PATIENT_FRAME_PROPERTIES: List[str] = [
+    "years",
+    "gender",
+    "age_group",
+    "broader_age_group",
+    "bmi",
+    "bmi_status",
+    "bmi_is_valid",
+    "ap_hi_status",
+    "ap_lo_status",
+    "height_is_valid",
+    "weight_is_valid",
+    "age_is_valid",
+    "is_valid",
+    "in_hypertension",
+    "is_overweight",
+    "is_underweight",
+    "is_healthy",
+]
+
+
+def _code(member: Enum) -> int:
+    """Position of an enum member in its enum, used as integer code"""
+    return list(type(member)).index(member)
+
+
+def _in_range(values: ndarray, valid_range: range) -> ndarray:
+    """Vectorized `value in valid_range` (only integral values can be in a range)"""
+    return (
+        (values >= valid_range.start)
+        & (values < valid_range.stop)
+        & (values == floor(values))
+    )
+
+
+def _lookup_ranges(values: ndarray, table: Dict[Enum, range]) -> ndarray:
+    """Vectorized lookup of the member whose range contains each value
+    The ranges of the tables are disjoint: a searchsorted on their starts finds
+    the only candidate, MISSING_CODE when the value is in none of them
+    """
+    members = sorted(table, key=lambda member: table[member].start)
+    starts = array([table[member].start for member in members])
+    stops = array([table[member].stop for member in members])
+    codes = array([_code(member) for member in members])
+
+    positions = searchsorted(starts, values, side="right") - 1
+    candidates = clip(positions, 0, None)
+    found = (
+        (positions >= 0) & (values < stops[candidates]) & (values == floor(values))
+    )
+    return where(found, codes[candidates], MISSING_CODE)
+
+
+def _lookup_ceilings(values: ndarray, table: Dict[Enum, int]) -> ndarray:
+    """Vectorized lookup of the first member whose ceiling is >= each value
+    The ceilings of the tables are increasing, as a walk-through in order does
+    """
+    members = list(table)
+    ceilings = array([table[member] for member in members])
+    codes = array([_code(member) for member in members])
+
+    positions = searchsorted(ceilings, values, side="left")
+    found = positions < len(members)
+    return where(found, codes[clip(positions, 0, len(members) - 1)], MISSING_CODE)
+
+
+def _ap_status_codes(
+    values: ndarray, table: Dict[Enum, int], invalid: Enum
+) -> ndarray:
+    """Vectorized version of Patient.ap_hi_status and Patient.ap_lo_status"""
+    accepted_range = range(min(table.values()), max(table.values()) + 1)
+    return where(
+        _in_range(trunc(values), accepted_range),
+        _lookup_ceilings(values, table),
+        _code(invalid),
+    )
+
+
+def _categorical(codes: ndarray, enum: Type[Enum], index) -> Series:
+    """Series of enum names from integer codes, MISSING_CODE becoming NaN"""
+    return Series(
+        Categorical.from_codes(codes, categories=[member.name for member in enum]),
+        index=index,
+    )
+
+
+class PatientFrame:
+    """Columnar Patient model
+    Every property of Patient is computed for all the patients of a dataset
+    at once, as a column, with the same answers as the scalar model.
+    The dataset has the create_patient schema (booleanized, see
+    _booleanize_dataset). Where Patient would raise a ValueError (ages out of
+    AGE_GROUP_VALUES, absurd BMI), the category is NaN and the flags depending
+    on it are False.
+    """
+
+    def __init__(self, dataset: DataFrame) -> None:
+        self.dataset = dataset
+        self.index = dataset.index
+        self.age = dataset[AGE_STR].to_numpy(dtype=float)
+        self.height = dataset[HEIGHT_STR].to_numpy(dtype=float)
+        self.weight = dataset[WEIGHT_STR].to_numpy(dtype=float)
+        self.ap_hi = dataset[AP_HI_STR].to_numpy(dtype=float)
+        self.ap_lo = dataset[AP_LO_STR].to_numpy(dtype=float)
+        self.sex = dataset[GENDER_STR].to_numpy(dtype=bool)
+
+    @cached_property
+    def _age_group_codes(self) -> ndarray:
+        return _lookup_ranges(self.years.to_numpy(), AGE_GROUP_VALUES)
+
+    @cached_property
+    def _broader_age_group_codes(self) -> ndarray:
+        codes = full(len(self.index), MISSING_CODE)
+        for broader_age_group, sub_groups in AGE_GROUP_REFERENCE.items():
+            codes[isin(self._age_group_codes, [_code(group) for group in sub_groups])] = (
+                _code(broader_age_group)
+            )
+        return codes
+
+    @cached_property
+    def _bmi_status_codes(self) -> ndarray:
+        codes = full(len(self.index), MISSING_CODE)
+        integer_bmi = trunc(self.bmi.to_numpy())
+        for broader_age_group, levels in BMI_VALUES.items():
+            in_group = self._broader_age_group_codes == _code(broader_age_group)
+            codes[in_group] = _lookup_ranges(integer_bmi[in_group], levels)
+        return codes
+
+    @cached_property
+    def _ap_hi_status_codes(self) -> ndarray:
+        return _ap_status_codes(self.ap_hi, AP_HIGH_VALUES, ApHighLevel.INVALID)
+
+    @cached_property
+    def _ap_lo_status_codes(self) -> ndarray:
+        return _ap_status_codes(self.ap_lo, AP_LOW_VALUES, ApLowLevel.INVALID)
+
+    @cached_property
+    def years(self) -> Series:
+        """Days to years to repr"""
+        return Series(trunc(self.age * _DAY_TO_YEAR_RATIO).astype(int), index=self.index)
+
+    @cached_property
+    def gender(self) -> Series:
+        """Quick Repr of gender"""
+        codes = where(self.sex, _code(Gender.FEMALE), _code(Gender.MALE))
+        return _categorical(codes, Gender, self.index)
+
+    @cached_property
+    def age_group(self) -> Series:
+        """Returns the age group"""
+        return _categorical(self._age_group_codes, AgeGroup, self.index)
+
+    @cached_property
+    def broader_age_group(self) -> Series:
+        """Simplifies the age group"""
+        return _categorical(self._broader_age_group_codes, AgeGroup, self.index)
+
+    @cached_property
+    def bmi(self) -> Series:
+        """Returns the bmi
+        numpy rounds x * 100 when Python rounds the exact value of x:
+        the few values close to a tie are rounded by Python
+        """
+        bmi = self.weight / ((self.height / 100) ** 2)
+        rounded_bmi = round_array(bmi, 2)
+        scaled_bmi = bmi * 100
+        close_to_tie = abs(scaled_bmi - floor(scaled_bmi) - 0.5) < 1e-6
+        rounded_bmi[close_to_tie] = [round(float(value), 2) for value in bmi[close_to_tie]]
+        return Series(rounded_bmi, index=self.index)
+
+    @cached_property
+    def bmi_status(self) -> Series:
+        """Method to get the BMI Status"""
+        return _categorical(self._bmi_status_codes, BmiLevel, self.index)
+
+    @cached_property
+    def bmi_is_valid(self) -> Series:
+        """Checks if bmi is in accepted range"""
+        valid = full(len(self.index), False)
+        integer_bmi = trunc(self.bmi.to_numpy())
+        for broader_age_group, valid_range in _ALLOWED_BMI_PER_GROUP.items():
+            in_group = self._broader_age_group_codes == _code(broader_age_group)
+            valid[in_group] = _in_range(integer_bmi[in_group], valid_range)
+        return Series(valid, index=self.index)
+
+    @cached_property
+    def ap_hi_status(self) -> Series:
+        """Method to get ap_hi status"""
+        return _categorical(self._ap_hi_status_codes, ApHighLevel, self.index)
+
+    @cached_property
+    def ap_lo_status(self) -> Series:
+        """Method to get ap_lo status"""
+        return _categorical(self._ap_lo_status_codes, ApLowLevel, self.index)
+
+    @cached_property
+    def height_is_valid(self) -> Series:
+        """Method to get height status"""
+        return Series(_in_range(self.height, _ALLOWED_HEIGHT), index=self.index)
+
+    @cached_property
+    def weight_is_valid(self) -> Series:
+        """Method to get weight status"""
+        return Series(_in_range(self.weight, _ALLOWED_WEIGHT), index=self.index)
+
+    @cached_property
+    def age_is_valid(self) -> Series:
+        """Method to get age status"""
+        return Series(_in_range(self.years.to_numpy(), _ALLOWED_AGE), index=self.index)
+
+    @cached_property
+    def is_valid(self) -> Series:
+        """Method to check if patient is valid"""
+        return (
+            (self._ap_hi_status_codes != _code(ApHighLevel.INVALID))
+            & (self._ap_hi_status_codes != MISSING_CODE)
+            & (self._ap_lo_status_codes != _code(ApLowLevel.INVALID))
+            & (self._ap_lo_status_codes != MISSING_CODE)
+            & self.height_is_valid
+            & self.weight_is_valid
+            & self.age_is_valid
+            & self.bmi_is_valid
+        )
+
+    @cached_property
+    def in_hypertension(self) -> Series:
+        """Returns if patient is in hypertension"""
+        hypertension_codes = {
+            ApHighLevel: [
+                _code(ApHighLevel.HYPERTENSION_STAGE_1),
+                _code(ApHighLevel.HYPERTENSION_STAGE_2),
+            ],
+            ApLowLevel: [
+                _code(ApLowLevel.HYPERTENSION_STAGE_1),
+                _code(ApLowLevel.HYPERTENSION_STAGE_2),
+            ],
+        }
+        return Series(
+            isin(self._ap_hi_status_codes, hypertension_codes[ApHighLevel])
+            | isin(self._ap_lo_status_codes, hypertension_codes[ApLowLevel]),
+            index=self.index,
+        )
+
+    @cached_property
+    def is_overweight(self) -> Series:
+        """Returns the patient is overweight"""
+        overweight_levels = [
+            BmiLevel.OBESITY_1,
+            BmiLevel.OBESITY_2,
+            BmiLevel.OBESITY_3,
+            BmiLevel.OVERWEIGHT,
+        ]
+        return Series(
+            isin(self._bmi_status_codes, [_code(level) for level in overweight_levels]),
+            index=self.index,
+        )
+
+    @cached_property
+    def is_underweight(self) -> Series:
+        """Returns if the patient is underweight"""
+        return Series(
+            self._bmi_status_codes == _code(BmiLevel.UNDERWEIGHT), index=self.index
+        )
+
+    @cached_property
+    def is_healthy(self) -> Series:
+        """No pathologies"""
+        return ~(self.in_hypertension | self.is_overweight | self.is_underweight) & (
+            self._bmi_status_codes != MISSING_CODE
+        )
+
+    def _field_columns(self) -> Dict[str, Callable[[], Series]]:
+        """Builders of the columns of the Patient fields"""
+        return {
+            "id": lambda: self.dataset[ID_STR],
+            "sex": lambda: Series(self.sex, index=self.index),
+            "age": lambda: Series(self.age, index=self.index),
+            "weight": lambda: Series(self.weight, index=self.index),
+            "height": lambda: Series(self.height, index=self.index),
+            "ap_hi": lambda: Series(self.ap_hi, index=self.index),
+            "ap_lo": lambda: Series(self.ap_lo, index=self.index),
+            "cholesterol": lambda: self.dataset[CHOLESTEROL_STR]
+            .map(LVL_MAP)
+            .astype("category")
+            .cat.set_categories([level.name for level in CholesterolLevel]),
+            "gluc": lambda: self.dataset[GLUC_STR]
+            .map(LVL_MAP)
+            .astype("category")
+            .cat.set_categories([level.name for level in GlucLevel]),
+            "smoke": lambda: self.dataset[SMOKE_STR].astype(bool),
+            "alco": lambda: self.dataset[ALCO_STR].astype(bool),
+            "active": lambda: self.dataset[ACTIVE_STR].astype(bool),
+            "cardio": lambda: self.dataset[CARDIO_STR].astype(bool),
+        }
+
+    def to_dataframe(self, columns: Optional[Sequence[str]] = None) -> DataFrame:
+        """DataFrame of the Patient fields and all the properties, the enums
+        as categorical columns of their names (as pydantic_to_df does)
+        With columns, only these fields and properties are computed
+        """
+        fields = self._field_columns()
+        if columns is None:
+            columns = [*fields, *PATIENT_FRAME_PROPERTIES]
+        return DataFrame(
+            {
+                name: fields[name]() if name in fields else getattr(self, name)
+                for name in columns
+            },
+            index=self.index,
+        )
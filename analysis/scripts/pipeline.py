@@ -0,0 +1,190 @@
+"""Incremental cleaning pipeline, from the cardio csv to the training features"""
+
+from dataclasses import dataclass, field
+from importlib.util import find_spec
+from io import BytesIO
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from pandas import DataFrame, RangeIndex, concat
+
+from scripts.generic_methods import (
+    CACHE_SUFFIX,
+    _booleanize_dataset,
+    _content_hash,
+    _read_cache,
+    _source_key,
+    _write_cache,
+    drop_by_filter,
+    load_dataset,
+)
+from scripts.patient_frame import PatientFrame
+
+SELECTED_FEATURES: List[str] = ["is_healthy", "ap_lo", "gluc", "cardio"]
+
+
+@dataclass
+class Stage:
+    """Step of the pipeline
+    The transform must handle each row independently of the others, so the
+    new rows of the source can go through it alone and be merged after.
+    A change in the code of the transform must be reflected in parameters.
+    """
+
+    name: str
+    transform: Callable[[DataFrame], DataFrame]
+    parameters: Dict[str, Any] = field(default_factory=dict)
+
+
+def _drop_invalid_patients(dataset: DataFrame) -> DataFrame:
+    """Stage removing the patients that are not valid"""
+    return drop_by_filter(
+        dataset, lambda patients: ~patients.is_valid, vectorized=True
+    )
+
+
+def _patient_features(dataset: DataFrame) -> DataFrame:
+    """Stage adding all the Patient properties as columns"""
+    return PatientFrame(dataset).to_dataframe()
+
+
+def cleaning_stages(
+    selected_features: Sequence[str] = SELECTED_FEATURES,
+) -> List[Stage]:
+    """Stages of the cleaning notebooks: booleanize, drop the invalid
+    patients, derive the Patient features and select the training ones"""
+    return [
+        Stage("booleanized", _booleanize_dataset),
+        Stage("valid", _drop_invalid_patients),
+        Stage("features", _patient_features),
+        Stage(
+            "selected",
+            lambda dataset: dataset[list(selected_features)],
+            {"features": list(selected_features)},
+        ),
+    ]
+
+
+class CleaningPipeline:
+    """Pipeline of stages from a source csv, the output of each stage cached
+    in Feather next to the source (see cached_stage)
+    A run starts from the last stage whose cache is still valid. When rows
+    were only appended to the source since that cache, only the new rows go
+    through the stages before it, then they are merged with the cache.
+    """
+
+    def __init__(
+        self,
+        source: str | Path,
+        sep: str,
+        stages: Optional[List[Stage]] = None,
+        dtypes: Optional[Dict[str, str]] = None,
+    ) -> None:
+        self.source = Path(source)
+        self.sep = sep
+        self.stages = stages if stages is not None else cleaning_stages()
+        self.dtypes = dtypes
+
+    def cache_path(self, position: int) -> Path:
+        """Path of the cache of the output of a stage"""
+        stage_name = self.stages[position].name
+        return self.source.with_name(
+            f"{self.source.stem}.{position}-{stage_name}{CACHE_SUFFIX}"
+        )
+
+    def _stage_chain(self, position: int) -> Dict[str, Any]:
+        """What the output of a stage depends on, besides the source"""
+        return {
+            "sep": self.sep,
+            "dtypes": self.dtypes,
+            "stages": [
+                {"name": stage.name, "parameters": stage.parameters}
+                for stage in self.stages[: position + 1]
+            ],
+        }
+
+    def _is_appended(self, source: Dict[str, Any], previous: Dict[str, Any]) -> bool:
+        """Checks if the source is the previous one with rows appended"""
+        if previous["size"] == 0 or source["size"] <= previous["size"]:
+            return False
+        with open(self.source, "rb") as file:
+            file.seek(previous["size"] - 1)
+            if file.read(1) != b"\n":
+                return False
+        return _content_hash(self.source, previous["size"]) == previous["sha256"]
+
+    def _read_rows(self, offset: int, first_index: int) -> DataFrame:
+        """Rows of the source after offset bytes, indexed as in the whole file"""
+        with open(self.source, "rb") as file:
+            header = file.readline()
+            file.seek(offset)
+            rows = file.read()
+        dataset = load_dataset(BytesIO(header + rows), self.sep, dtypes=self.dtypes)
+        dataset.index = RangeIndex(first_index, first_index + len(dataset))
+        return dataset
+
+    def _transform(self, dataset: DataFrame, start: int, stop: int) -> DataFrame:
+        """Output of the stages from start to stop (excluded)"""
+        for stage in self.stages[start:stop]:
+            dataset = stage.transform(dataset)
+        return dataset
+
+    def _stage_key(
+        self, position: int, source: Dict[str, Any], number_rows: int
+    ) -> Dict[str, Any]:
+        """Key of the cache of a stage"""
+        return {
+            "source": source,
+            "rows": number_rows,
+            "chain": self._stage_chain(position),
+        }
+
+    def _reusable_stage(self) -> tuple[int, DataFrame, Dict[str, Any], int]:
+        """Last stage whose cache is up to date or can be completed with the
+        new rows of the source, with its output, the source fingerprint and
+        the number of rows of the source (-1 and the loaded source if none)
+        Its cache is updated when it changed"""
+        for position in reversed(range(len(self.stages))):
+            table, key = _read_cache(self.cache_path(position))
+            if key is None or key["chain"] != self._stage_chain(position):
+                continue
+            source = _source_key(self.source, key["source"])
+            if source["sha256"] == key["source"]["sha256"]:
+                dataset, number_rows = table.to_pandas(), key["rows"]
+            elif self._is_appended(source, key["source"]):
+                new_rows = self._read_rows(key["source"]["size"], key["rows"])
+                dataset = concat(
+                    [table.to_pandas(), self._transform(new_rows, 0, position + 1)]
+                )
+                number_rows = key["rows"] + len(new_rows)
+            else:
+                continue
+            if source != key["source"]:
+                _write_cache(
+                    self.cache_path(position),
+                    dataset,
+                    self._stage_key(position, source, number_rows),
+                )
+            return position, dataset, source, number_rows
+
+        dataset = load_dataset(self.source, self.sep, dtypes=self.dtypes)
+        return -1, dataset, _source_key(self.source, None), len(dataset)
+
+    def run(self) -> DataFrame:
+        """Output of the last stage, computed only from what changed
+        Without pyarrow nothing is cached and every stage runs on the source"""
+        if find_spec("pyarrow") is None:
+            return self._transform(
+                load_dataset(self.source, self.sep, dtypes=self.dtypes),
+                0,
+                len(self.stages),
+            )
+        position, dataset, source, number_rows = self._reusable_stage()
+        for next_position in range(position + 1, len(self.stages)):
+            dataset = self.stages[next_position].transform(dataset)
+            _write_cache(
+                self.cache_path(next_position),
+                dataset,
+                self._stage_key(next_position, source, number_rows),
+            )
+        return dataset
@@ -1,15 +1,19 @@
-import enum
+from functools import cached_property
+from numpy import array
 from pydantic import BaseModel
 import seaborn as sns
 import matplotlib.pyplot as plt
-from typing import Any, Callable, Dict, List
+from typing import Any, Callable, Dict, List, Optional, Type, Union, get_type_hints
+from pandas import Categorical, Series
 from pandas.core.frame import DataFrame
 from enum import Enum
 
 from scripts.patient import Patient
-from scripts.create_patient import create_patient
+from scripts.create_patient import PATIENT_FIELDS, create_patients
 from scripts.bmi import AgeGroup, BmiLevel
+from scripts.cohorts import count_cohorts, to_counts
 from scripts.definitions import ApHighLevel, ApLowLevel
+from scripts.patient_frame import PATIENT_FRAME_PROPERTIES, PatientFrame
 
 
 class Status(Enum):
@@ -20,8 +24,8 @@ class Status(Enum):
 def plot_patients_by_status(
     dataset: DataFrame, status_function: Callable[[Patient], Status]
 ) -> None:
-    status_counts = dataset.apply(
-        lambda row: status_function(create_patient(row)), axis=1  # type: ignore
+    status_counts = Series(
+        [status_function(patient) for patient in create_patients(dataset)]
     ).value_counts()
 
     status_function_name = status_function.__name__
@@ -42,101 +46,69 @@ def plot_patients_by_status(
     plt.show()
 
 
-def create_all_patients(dataset: DataFrame) -> List[Patient]:
-    """Create all patients object"""
-    patients = []
-    for _, row in dataset.iterrows():
-        patients.append(create_patient(row))
-    return patients
+def create_all_patients(
+    dataset: DataFrame, n_jobs: Optional[int] = None, validate: bool = True
+) -> List[Patient]:
+    """Create all patients object
+    Built by chunks of records, see create_patients for n_jobs and validate"""
+    return create_patients(dataset, n_jobs=n_jobs, validate=validate)
 
 
 def count_by_bmi_category(
-    patients: List[Patient],
+    patients: Union[PatientFrame, List[Patient]],
 ) -> tuple[Dict[BmiLevel, int], Dict[BmiLevel, int]]:
     """Count the number of patients in each BMI category."""
-    counts = {level: 0 for level in BmiLevel}
-    cardio_occurences = counts
-    for patient in patients:
-        counts[patient.bmi_status] += 1
-        if patient.cardio:
-            cardio_occurences[patient.bmi_status] += 1
-    return counts, cardio_occurences
+    return to_counts(count_cohorts(patients, ["bmi_status"]))
 
 
 def count_by_age_group(
-    patients: List[Patient],
+    patients: Union[PatientFrame, List[Patient]],
 ) -> tuple[Dict[AgeGroup, int], Dict[AgeGroup, int]]:
     """Count the number of patients in each age group."""
-    counts = {group: 0 for group in AgeGroup}
-    cardio_occurences = counts
-    for patient in patients:
-        counts[patient.broader_age_group] += 1
-        if patient.cardio:
-            cardio_occurences[patient.broader_age_group] += 1
-    del counts[AgeGroup.KID]
-    del counts[AgeGroup.SENIOR]
-    del counts[AgeGroup.TEEN]
-    del counts[AgeGroup.YOUNG_ADULT]
-    del counts[AgeGroup.ADULT]
-    del cardio_occurences[AgeGroup.KID]
-    del cardio_occurences[AgeGroup.SENIOR]
-    del cardio_occurences[AgeGroup.TEEN]
-    del cardio_occurences[AgeGroup.YOUNG_ADULT]
-    del cardio_occurences[AgeGroup.ADULT]
-    return counts, cardio_occurences
+    return to_counts(
+        count_cohorts(patients, ["broader_age_group"]),
+        excluded=[
+            AgeGroup.KID,
+            AgeGroup.SENIOR,
+            AgeGroup.TEEN,
+            AgeGroup.YOUNG_ADULT,
+            AgeGroup.ADULT,
+        ],
+    )
 
 
 def count_by_ap_hi_status(
-    patients: List[Patient],
+    patients: Union[PatientFrame, List[Patient]],
 ) -> tuple[Dict[ApHighLevel, int], Dict[ApHighLevel, int]]:
     """Count the number of patients in each ap_hi status."""
-    counts = {level: 0 for level in ApHighLevel}
-    cardio_occurences = counts
-    for patient in patients:
-        counts[patient.ap_hi_status] += 1
-        if patient.cardio:
-            cardio_occurences[patient.ap_hi_status] += 1
-    del counts[ApHighLevel.INVALID]
-    del cardio_occurences[ApHighLevel.INVALID]
-    return counts, cardio_occurences
+    return to_counts(
+        count_cohorts(patients, ["ap_hi_status"]), excluded=[ApHighLevel.INVALID]
+    )
 
 
 def count_by_ap_lo_status(
-    patients: List[Patient],
+    patients: Union[PatientFrame, List[Patient]],
 ) -> tuple[Dict[ApLowLevel, int], Dict[ApLowLevel, int]]:
     """Count the number of patients in each ap_lo status."""
-    counts = {level: 0 for level in ApLowLevel}
-    cardio_occurences = counts
-    for patient in patients:
-        counts[patient.ap_lo_status] += 1
-        if patient.cardio:
-            cardio_occurences[patient.ap_lo_status] += 1
-    del counts[ApLowLevel.INVALID]
-    del cardio_occurences[ApLowLevel.INVALID]
-    return counts, cardio_occurences
+    return to_counts(
+        count_cohorts(patients, ["ap_lo_status"]), excluded=[ApLowLevel.INVALID]
+    )
 
 
 def count_by_age_group_2(
-    patients: List[Patient],
+    patients: Union[PatientFrame, List[Patient]],
 ) -> tuple[Dict[AgeGroup, int], Dict[AgeGroup, int]]:
     """Count the number of patients in each age group."""
-    counts = {group: 0 for group in AgeGroup}
-    cardio_occurences = counts
-    for patient in patients:
-        counts[patient.age_group] += 1
-        if patient.cardio:
-            cardio_occurences[patient.age_group] += 1
-    del counts[AgeGroup.KID]
-    del counts[AgeGroup.KIDS]
-    del counts[AgeGroup.TEEN]
-    del counts[AgeGroup.YOUNG_ADULT]
-    del counts[AgeGroup.ADULTS]
-    del cardio_occurences[AgeGroup.KID]
-    del cardio_occurences[AgeGroup.KIDS]
-    del cardio_occurences[AgeGroup.TEEN]
-    del cardio_occurences[AgeGroup.YOUNG_ADULT]
-    del cardio_occurences[AgeGroup.ADULTS]
-    return counts, cardio_occurences
+    return to_counts(
+        count_cohorts(patients, ["age_group"]),
+        excluded=[
+            AgeGroup.KID,
+            AgeGroup.KIDS,
+            AgeGroup.TEEN,
+            AgeGroup.YOUNG_ADULT,
+            AgeGroup.ADULTS,
+        ],
+    )
 
 
 def plot_counts(res: tuple[Dict[Enum, int], Dict[Enum, int]]) -> None:
@@ -170,35 +142,71 @@ def plot_counts(res: tuple[Dict[Enum, int], Dict[Enum, int]]) -> None:
     plt.show()
 
 
-from icecream import ic
-
-
-def get_attrs(obj: object) -> set[str]:
-    """gets all the attributes, and properties of an object
-    excluding default object attributes"""
-    attrs = set()
-    for attr in dir(obj):
-        if not (attr.startswith("__") or attr.startswith("_")):
-            attrs.add(attr)
-    return attrs
-
-
-def create_row(obj: object, attrs: set[str]) -> dict[str, Any]:
-    """Creates row, ommit enum types"""
-    row = {}
-    for attr in attrs:
-        att = getattr(obj, attr)
-        if isinstance(att, Enum):
-            att = att.name
-        row[attr] = att
-    return row
+def model_schema(model: Type[BaseModel]) -> Dict[str, Any]:
+    """Columns of a pydantic model (its fields then its properties) with
+    their types, read once from the annotations instead of per object"""
+    schema = {name: field.annotation for name, field in model.model_fields.items()}
+    for klass in reversed(model.__mro__):
+        if klass in BaseModel.__mro__:
+            continue
+        for name, attribute in vars(klass).items():
+            if name.startswith("_"):
+                continue
+            if isinstance(attribute, cached_property):
+                schema[name] = get_type_hints(attribute.func).get("return")
+            elif isinstance(attribute, property):
+                schema[name] = get_type_hints(attribute.fget).get("return")
+    return schema
+
+
+def _typed_column(values: List[Any], annotation: Any) -> Any:
+    """Column of values, categorical of the names for enums"""
+    if isinstance(annotation, type) and issubclass(annotation, Enum):
+        codes = {member: code for code, member in enumerate(annotation)}
+        return Categorical.from_codes(
+            [codes[value] for value in values],
+            categories=[member.name for member in annotation],
+        )
+    if annotation in (bool, int, float):
+        return array(values, dtype=annotation)
+    return values
+
+
+def _patient_frame(field_columns: Dict[str, List[Any]]) -> PatientFrame:
+    """PatientFrame of the columns of the Patient fields, to compute the
+    properties column by column instead of object by object"""
+    return PatientFrame(
+        DataFrame(
+            {
+                column: field_columns[field]
+                for column, field in PATIENT_FIELDS.items()
+                if field not in ("cholesterol", "gluc")
+            }
+        )
+    )
 
 
 def pydantic_to_df(pydantic_objs: List[BaseModel]) -> DataFrame:
-    """Converts a list of Pydantic objects to a DataFrame using attributes from get_attrs."""
-    attrs = get_attrs(pydantic_objs[0]) - get_attrs(BaseModel)
-    data = []
-    for obj in pydantic_objs:
-        row = create_row(obj, attrs)
-        data.append(row)
-    return DataFrame(data)
+    """Converts a list of Pydantic objects to a DataFrame using attributes from model_schema.
+    Built column by column, enums as categorical columns of their names.
+    The properties of Patient are computed by PatientFrame, all at once."""
+    model = type(pydantic_objs[0])
+    schema = model_schema(model)
+    field_columns = {
+        name: [getattr(obj, name) for obj in pydantic_objs] for name in model.model_fields
+    }
+    patient_frame = (
+        _patient_frame(field_columns) if issubclass(model, Patient) else None
+    )
+
+    columns = {}
+    for name, annotation in schema.items():
+        if name in field_columns:
+            columns[name] = _typed_column(field_columns[name], annotation)
+        elif patient_frame is not None and name in PATIENT_FRAME_PROPERTIES:
+            columns[name] = getattr(patient_frame, name).values
+        else:
+            columns[name] = _typed_column(
+                [getattr(obj, name) for obj in pydantic_objs], annotation
+            )
+    return DataFrame(columns)
@@ -0,0 +1,278 @@
+"""Asynchronous HTTP scoring server of a saved model, micro-batching the requests.
+
+The patients are posted as json, one object or a list of objects in the cardio_train.csv schema (id and cardio
+optional), to POST /score. The requests arriving within max_wait of each other are scored together: one
+DataFrame, one design_matrix and one predict_proba call per batch, in a worker thread so the event loop keeps
+reading the next requests meanwhile.
+
+Usage:
+    python -m scripts.serving model.bin --port 8000 --max-wait-ms 2
+    python -m scripts.load_generator ../data/original/cardio_train.csv --port 8000
+"""
+
+from argparse import ArgumentParser
+from asyncio import (
+    Future,
+    IncompleteReadError,
+    LimitOverrunError,
+    Queue,
+    StreamReader,
+    StreamWriter,
+    TimeoutError as WaitTimeoutError,
+    get_running_loop,
+    run,
+    start_server,
+    wait_for,
+)
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from itertools import chain
+from json import dumps, loads
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Tuple
+
+from numpy import cumsum, ndarray, split
+
+from scripts.design import MODEL_FEATURES, design_matrix, records_to_dataset
+from scripts.models import load_model, positive_probability
+
+Records = List[Dict[str, Any]]
+
+# largest body read, so a client cannot make the server buffer any amount
+MAX_BODY_SIZE = 8 * 2**20
+
+
+class MicroBatcher:
+    """Queue gathering the patients of concurrent requests into batches
+    A batch starts with the first waiting request and takes the ones
+    arriving during max_wait seconds after it, up to max_batch_size
+    patients; it is scored in a single thread while the next one fills up.
+    """
+
+    def __init__(
+        self,
+        model: Any,
+        features: Sequence[str] = MODEL_FEATURES,
+        max_wait: float = 0.002,
+        max_batch_size: int = 1024,
+    ) -> None:
+        self.model = model
+        self.features = list(features)
+        self.max_wait = max_wait
+        self.max_batch_size = max_batch_size
+        self.queue: Queue[Tuple[Records, Future]] = Queue()
+        self.executor = ThreadPoolExecutor(max_workers=1)
+
+    async def score(self, records: Records) -> ndarray:
+        """Probabilities of the patients, once their batch is scored
+        Raises a ValueError when a patient is not in the cardio_train schema"""
+        future = get_running_loop().create_future()
+        await self.queue.put((records, future))
+        return await future
+
+    def _score_batch(self, batch: List[Records]) -> List[ndarray | ValueError]:
+        """Probabilities of each request of a batch, or the error of the
+        requests with invalid patients (which are then scored one by one)"""
+        try:
+            dataset = records_to_dataset(list(chain.from_iterable(batch)))
+        except ValueError as error:
+            if len(batch) == 1:
+                return [error]
+            return [self._score_batch([records])[0] for records in batch]
+        probabilities = positive_probability(
+            self.model, design_matrix(dataset, self.features)
+        )
+        return split(probabilities, cumsum([len(records) for records in batch])[:-1])
+
+    async def _next_batch(self) -> List[Tuple[Records, Future]]:
+        """Requests waiting, or arriving before max_wait after the first one"""
+        loop = get_running_loop()
+        batch = [await self.queue.get()]
+        number_rows = len(batch[0][0])
+        deadline = loop.time() + self.max_wait
+        while number_rows < self.max_batch_size:
+            if self.queue.empty():
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await wait_for(self.queue.get(), remaining))
+                except WaitTimeoutError:
+                    break
+            else:
+                batch.append(self.queue.get_nowait())
+            number_rows += len(batch[-1][0])
+        return batch
+
+    async def run(self) -> None:
+        """Loop scoring the batches, until cancelled"""
+        loop = get_running_loop()
+        while True:
+            batch = await self._next_batch()
+            try:
+                results = await loop.run_in_executor(
+                    self.executor, self._score_batch, [records for records, _ in batch]
+                )
+            except Exception as error:
+                results = [error] * len(batch)
+            for (_, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+
+def _response(status: HTTPStatus, payload: Dict[str, Any], keep_alive: bool) -> bytes:
+    """HTTP/1.1 response with a json body"""
+    body = dumps(payload).encode()
+    return (
+        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    ).encode() + body
+
+
+class ScoringServer:
+    """Minimal HTTP/1.1 server (keep-alive, Content-Length bodies) of
+    GET /health and POST /score, over a MicroBatcher"""
+
+    def __init__(self, batcher: MicroBatcher) -> None:
+        self.batcher = batcher
+        self.threshold = getattr(batcher.model, "threshold", 0.5)
+
+    async def _score(self, body: bytes) -> Tuple[HTTPStatus, Dict[str, Any]]:
+        """Status and payload of a scoring request"""
+        try:
+            records = loads(body)
+        except ValueError:
+            return HTTPStatus.BAD_REQUEST, {"error": "The body is not json"}
+        if isinstance(records, dict):
+            records = [records]
+        if not isinstance(records, list) or not all(
+            isinstance(record, dict) for record in records
+        ):
+            return HTTPStatus.BAD_REQUEST, {"error": "Expected patients objects"}
+        if not records:
+            return HTTPStatus.OK, {"probabilities": [], "predictions": []}
+        try:
+            probabilities = await self.batcher.score(records)
+        except ValueError as error:
+            return HTTPStatus.UNPROCESSABLE_ENTITY, {"error": str(error)}
+        return HTTPStatus.OK, {
+            "probabilities": probabilities.tolist(),
+            "predictions": (probabilities > self.threshold).tolist(),
+        }
+
+    async def _route(
+        self, method: str, target: str, body: bytes
+    ) -> Tuple[HTTPStatus, Dict[str, Any]]:
+        """Status and payload of a request"""
+        if target == "/score" and method == "POST":
+            return await self._score(body)
+        if target == "/health" and method == "GET":
+            return HTTPStatus.OK, {
+                "status": "ok",
+                "model": type(self.batcher.model).__name__,
+                "features": self.batcher.features,
+            }
+        return HTTPStatus.NOT_FOUND, {"error": f"No route {method} {target}"}
+
+    async def handle(self, reader: StreamReader, writer: StreamWriter) -> None:
+        """Serve the requests of a connection until it is closed"""
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (IncompleteReadError, LimitOverrunError):
+                    break
+                request_line, *header_lines = head.decode("latin-1").split("\r\n")
+                headers = {
+                    name.strip().lower(): value.strip()
+                    for name, _, value in (line.partition(":") for line in header_lines)
+                    if name
+                }
+                try:
+                    method, target, version = request_line.split(" ", 2)
+                    content_length = int(headers.get("content-length", 0))
+                    if not 0 <= content_length <= MAX_BODY_SIZE:
+                        raise ValueError(content_length)
+                except ValueError:
+                    writer.write(
+                        _response(
+                            HTTPStatus.BAD_REQUEST,
+                            {
+                                "error": "Malformed request line or Content-Length"
+                                f" (at most {MAX_BODY_SIZE} bytes)"
+                            },
+                            keep_alive=False,
+                        )
+                    )
+                    await writer.drain()
+                    break
+                body = await reader.readexactly(content_length)
+                keep_alive = headers.get("connection", "").lower() != "close" and (
+                    version != "HTTP/1.0"
+                )
+                try:
+                    status, payload = await self._route(method, target, body)
+                except Exception as error:
+                    status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {
+                        "error": f"{type(error).__name__}: {error}"
+                    }
+                writer.write(_response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(
+    model_path: str | Path,
+    host: str = "127.0.0.1",
+    port: int = 8000,
+    features: Sequence[str] = MODEL_FEATURES,
+    max_wait: float = 0.002,
+    max_batch_size: int = 1024,
+) -> None:
+    """Run the scoring server of a saved model until cancelled"""
+    batcher = MicroBatcher(load_model(model_path), features, max_wait, max_batch_size)
+    server = await start_server(ScoringServer(batcher).handle, host, port)
+    batching = get_running_loop().create_task(batcher.run())
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        batching.cancel()
+        batcher.executor.shutdown()
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("model", help="file saved by the save method of a model")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--features",
+        default=",".join(MODEL_FEATURES),
+        help="comma separated Patient features the model was trained on",
+    )
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    parser.add_argument("--max-batch-size", type=int, default=1024)
+    arguments = parser.parse_args()
+
+    run(
+        serve(
+            arguments.model,
+            arguments.host,
+            arguments.port,
+            arguments.features.split(","),
+            arguments.max_wait_ms / 1000,
+            arguments.max_batch_size,
+        )
+    )
@@ -0,0 +1,283 @@
+"""Synthetic cardio datasets of any size, fitted on the original csv.
+
+Each column keeps its empirical distribution (its distinct values and their frequencies), outliers included, so the
+generated patients are rejected by Patient.is_valid about as often as the real ones. The dependencies between the
+columns are kept by a gaussian copula: correlated normal vectors are drawn and each coordinate is mapped to a value
+through the quantiles of its column, the correlation being fitted so that the rank correlations of the generated
+columns are the ones of the source.
+
+The rows are generated by chunks in a pool of processes, the chunk i from the seed [seed, i] whatever the number
+of processes, so the same seed always gives the same file.
+
+Usage:
+    python -m scripts.synthetic ../data/synthetic/cardio_10M.csv --rows 10000000 --n-jobs -1
+"""
+
+from argparse import ArgumentParser
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from importlib import import_module
+from importlib.util import find_spec
+from io import BytesIO
+from os import cpu_count
+from pathlib import Path
+from statistics import NormalDist
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
+
+from numpy import (
+    arange,
+    array,
+    corrcoef,
+    cumsum,
+    diag,
+    maximum,
+    ndarray,
+    outer,
+    searchsorted,
+    sqrt,
+    unique,
+)
+from numpy.linalg import cholesky, eigh
+from numpy.random import Generator, default_rng
+from pandas import DataFrame
+
+from scripts.create_patient import ID_STR
+from scripts.generic_methods import load_dataset
+
+SOURCE_PATH = "../data/original/cardio_train.csv"
+PARQUET_SUFFIXES = (".parquet", ".pq")
+
+_CALIBRATION_ROWS = 200_000
+_CALIBRATION_ROUNDS = 6
+
+
+@dataclass
+class CardioDistribution:
+    """Fitted distribution of the columns of the cardio csv (but the id):
+    the distinct values of each column, the normal quantiles splitting
+    them by their frequencies, and the factor of the copula correlation"""
+
+    columns: List[str]
+    values: Dict[str, ndarray]
+    thresholds: Dict[str, ndarray]
+    cholesky_factor: ndarray
+
+
+def _marginal(values: ndarray) -> Tuple[ndarray, ndarray, ndarray]:
+    """Distinct values, the normal quantiles of their cumulated frequencies
+    (the last one apart) and the normal score of their mid rank"""
+    distinct, counts = unique(values, return_counts=True)
+    cumulated = cumsum(counts) / len(values)
+    normal = NormalDist()
+    thresholds = array([normal.inv_cdf(rank) for rank in cumulated[:-1]])
+    scores = array(
+        [normal.inv_cdf(rank) for rank in cumulated - counts / (2 * len(values))]
+    )
+    return distinct, thresholds, scores
+
+
+def _score_correlation(columns: Dict[str, ndarray]) -> ndarray:
+    """Correlation of the normal scores of the columns (a rank correlation)"""
+    scores = []
+    for values in columns.values():
+        distinct, _, distinct_scores = _marginal(values)
+        scores.append(distinct_scores[searchsorted(distinct, values)])
+    return corrcoef(scores)
+
+
+def _nearest_correlation(matrix: ndarray) -> ndarray:
+    """Correlation matrix closest to a symmetric one, positive definite"""
+    eigenvalues, eigenvectors = eigh(matrix)
+    matrix = (eigenvectors * maximum(eigenvalues, 1e-6)) @ eigenvectors.T
+    deviations = sqrt(diag(matrix))
+    return matrix / outer(deviations, deviations)
+
+
+def _draw(
+    distribution: CardioDistribution, number_rows: int, generator: Generator
+) -> Dict[str, ndarray]:
+    """Columns of number_rows rows drawn from the distribution"""
+    normal = (
+        generator.standard_normal((number_rows, len(distribution.columns)))
+        @ distribution.cholesky_factor.T
+    )
+    return {
+        column: distribution.values[column][
+            searchsorted(distribution.thresholds[column], normal[:, position])
+        ]
+        for position, column in enumerate(distribution.columns)
+    }
+
+
+def fit_distribution(dataset: DataFrame, seed: int = 0) -> CardioDistribution:
+    """Marginals and gaussian copula of the columns of a dataset of the
+    original csv schema
+    The ties of the discrete columns weaken the correlations of the drawn
+    values, so the copula correlation is corrected a few rounds, until the
+    rank correlations of a sample match the ones of the dataset"""
+    columns = [column for column in dataset.columns if column != ID_STR]
+    source = {column: dataset[column].to_numpy() for column in columns}
+    marginals = {column: _marginal(source[column]) for column in columns}
+    target = _score_correlation(source)
+    distribution = CardioDistribution(
+        columns=columns,
+        values={column: marginals[column][0] for column in columns},
+        thresholds={column: marginals[column][1] for column in columns},
+        cholesky_factor=cholesky(target),
+    )
+    correlation = target
+    for _ in range(_CALIBRATION_ROUNDS):
+        drawn = _draw(distribution, _CALIBRATION_ROWS, default_rng(seed))
+        correlation = _nearest_correlation(
+            correlation + target - _score_correlation(drawn)
+        )
+        distribution.cholesky_factor = cholesky(correlation)
+    return distribution
+
+
+def sample(
+    distribution: CardioDistribution, number_rows: int, seed: List[int], first_id: int
+) -> DataFrame:
+    """Dataset of number_rows synthetic patients, ids from first_id"""
+    dataset = {ID_STR: arange(first_id, first_id + number_rows)}
+    dataset.update(_draw(distribution, number_rows, default_rng(seed)))
+    return DataFrame(dataset)
+
+
+_DISTRIBUTION: Optional[CardioDistribution] = None
+
+
+def _set_distribution(distribution: CardioDistribution) -> None:
+    """Initializer of the workers, to send the distribution only once"""
+    global _DISTRIBUTION
+    _DISTRIBUTION = distribution
+
+
+def _generate_chunk(
+    chunk: Tuple[int, int, int], seed: int, as_csv: bool
+) -> bytes | DataFrame:
+    """Rows of a chunk (index, first id, number of rows), encoded as csv
+    lines (the header apart), or as a DataFrame for parquet"""
+    index, first_id, number_rows = chunk
+    dataset = sample(_DISTRIBUTION, number_rows, [seed, index], first_id)
+    if not as_csv:
+        return dataset
+    if find_spec("pyarrow") is None:
+        return dataset.to_csv(sep=";", index=False, header=False).encode()
+    lines = BytesIO()
+    import_module("pyarrow.csv").write_csv(
+        import_module("pyarrow").Table.from_pandas(dataset, preserve_index=False),
+        lines,
+        import_module("pyarrow.csv").WriteOptions(include_header=False, delimiter=";"),
+    )
+    return lines.getvalue()
+
+
+def _chunks(number_rows: int, chunk_size: int) -> Iterator[Tuple[int, int, int]]:
+    """Index, first id and number of rows of each chunk"""
+    for index, start in enumerate(range(0, number_rows, chunk_size)):
+        yield index, start, min(chunk_size, number_rows - start)
+
+
+def generate(
+    output_path: str | Path,
+    number_rows: int,
+    seed: int = 0,
+    chunk_size: int = 500_000,
+    n_jobs: Optional[int] = None,
+    source_path: str | Path = SOURCE_PATH,
+) -> None:
+    """Write a synthetic dataset of the original csv schema (";" separated)
+    or a parquet file, the chunks generated by n_jobs processes (all the
+    cores for -1, in process for None or 0) and written in order; the seed
+    draws the calibration sample of the copula and the rows"""
+    distribution = fit_distribution(load_dataset(source_path, ";"), seed)
+    output_path = Path(output_path)
+    as_csv = output_path.suffix not in PARQUET_SUFFIXES
+    chunks = list(_chunks(number_rows, chunk_size))
+
+    if not n_jobs:
+        _set_distribution(distribution)
+        generated = (_generate_chunk(chunk, seed, as_csv) for chunk in chunks)
+        _write(output_path, distribution, generated, as_csv)
+        return
+    number_workers = (cpu_count() or 1) if n_jobs < 0 else n_jobs
+    with ProcessPoolExecutor(
+        max_workers=number_workers,
+        initializer=_set_distribution,
+        initargs=(distribution,),
+    ) as executor:
+        generated = _in_order(executor, chunks, seed, as_csv, 2 * number_workers)
+        _write(output_path, distribution, generated, as_csv)
+
+
+def _in_order(
+    executor: ProcessPoolExecutor,
+    chunks: List[Tuple[int, int, int]],
+    seed: int,
+    as_csv: bool,
+    window: int,
+) -> Iterator[bytes | DataFrame]:
+    """Generated chunks in order, at most window of them submitted ahead of
+    the writer, so a slow disk does not pile them up in memory"""
+    pending: Deque[Future] = deque()
+    for chunk in chunks:
+        pending.append(executor.submit(_generate_chunk, chunk, seed, as_csv))
+        if len(pending) == window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def _write(
+    output_path: Path,
+    distribution: CardioDistribution,
+    generated: Iterator[bytes | DataFrame],
+    as_csv: bool,
+) -> None:
+    """Append the generated chunks, in order, to the output file"""
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    if as_csv:
+        with open(output_path, "wb") as file:
+            file.write((";".join([ID_STR, *distribution.columns]) + "\n").encode())
+            for lines in generated:
+                file.write(lines)
+        return
+    writer = None
+    for dataset in generated:
+        table = import_module("pyarrow").Table.from_pandas(
+            dataset, preserve_index=False
+        )
+        if writer is None:
+            writer = import_module("pyarrow.parquet").ParquetWriter(
+                output_path, table.schema
+            )
+        writer.write_table(table)
+    if writer is not None:
+        writer.close()
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("output", help="csv or parquet file to write")
+    parser.add_argument("--rows", type=int, required=True)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-size", type=int, default=500_000)
+    parser.add_argument(
+        "--n-jobs",
+        type=int,
+        default=None,
+        help="number of processes, -1 for all the cores, in process when omitted or 0",
+    )
+    parser.add_argument("--source", default=SOURCE_PATH)
+    arguments = parser.parse_args()
+
+    generate(
+        arguments.output,
+        arguments.rows,
+        arguments.seed,
+        arguments.chunk_size,
+        arguments.n_jobs,
+        arguments.source,
+    )
@@ -0,0 +1,53 @@
+from enum import Enum
+from pathlib import Path
+from typing import Any
+
+import pytest
+from pandas import isna
+
+from scripts.create_patient import create_patient
+from scripts.generic_methods import CARDIO_DTYPES, _booleanize_dataset, load_dataset
+from scripts.patient_frame import PATIENT_FRAME_PROPERTIES, PatientFrame
+
+ORIGINAL_PATH = Path(__file__).parents[2] / "data" / "original" / "cardio_train.csv"
+
+
+@pytest.fixture(scope="module")
+def dataset():
+    """Booleanized rows of the original csv, the invalid patients included"""
+    return _booleanize_dataset(
+        load_dataset(ORIGINAL_PATH, ";", dtypes=CARDIO_DTYPES).head(5000)
+    )
+
+
+def _patient_value(patient: Any, name: str) -> Any:
+    """Property of a Patient as PatientFrame gives it, the enums by name,
+    None where the Patient raises a ValueError"""
+    try:
+        value = getattr(patient, name)
+    except ValueError:
+        return None
+    return value.name if isinstance(value, Enum) else value
+
+
+def _frame_value(value: Any) -> Any:
+    return None if isna(value) else value
+
+
+def test_patient_frame_matches_patient(dataset) -> None:
+    frame = PatientFrame(dataset).to_dataframe(PATIENT_FRAME_PROPERTIES)
+    for position, (_, row) in enumerate(dataset.iterrows()):
+        patient = create_patient(row)
+        for name in PATIENT_FRAME_PROPERTIES:
+            expected = _patient_value(patient, name)
+            if expected is None and frame[name].dtype == bool:
+                expected = False  # the flags depending on a ValueError
+            assert _frame_value(frame[name].iloc[position]) == expected, (
+                f"{name} of the patient {row['id']}"
+            )
+
+
+def test_selected_columns_match_all_columns(dataset) -> None:
+    frame = PatientFrame(dataset)
+    columns = ["is_healthy", "ap_lo", "gluc", "bmi_status"]
+    assert frame.to_dataframe(columns).equals(frame.to_dataframe()[columns])
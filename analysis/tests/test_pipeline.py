@@ -0,0 +1,59 @@
+from pathlib import Path
+
+import pytest
+
+from scripts.pipeline import CleaningPipeline, cleaning_stages
+from tests.test_patient_frame import ORIGINAL_PATH
+
+pytest.importorskip("pyarrow")
+
+
+@pytest.fixture(scope="module")
+def lines() -> list[bytes]:
+    """Header and first rows of the original csv"""
+    with open(ORIGINAL_PATH, "rb") as file:
+        return [file.readline() for _ in range(6001)]
+
+
+def _write(path: Path, lines: list[bytes]) -> Path:
+    path.parent.mkdir(exist_ok=True)
+    path.write_bytes(b"".join(lines))
+    return path
+
+
+def test_incremental_run_matches_a_full_run(
+    tmp_path: Path, lines, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    full = CleaningPipeline(_write(tmp_path / "full" / "cardio.csv", lines), ";").run()
+
+    source = _write(tmp_path / "incremental" / "cardio.csv", lines[:4001])
+    pipeline = CleaningPipeline(source, ";")
+    pipeline.run()
+    with open(source, "ab") as file:
+        file.write(b"".join(lines[4001:]))
+    read_offsets = []
+    read_rows = CleaningPipeline._read_rows
+    monkeypatch.setattr(
+        CleaningPipeline,
+        "_read_rows",
+        lambda self, offset, first_index: read_offsets.append(offset)
+        or read_rows(self, offset, first_index),
+    )
+    incremental = pipeline.run()
+
+    assert read_offsets == [len(b"".join(lines[:4001]))]
+    assert incremental.equals(full)
+    assert incremental.index.equals(full.index)
+    assert pipeline.run().equals(full)
+
+
+def test_new_parameters_of_the_last_stage(tmp_path: Path, lines) -> None:
+    source = _write(tmp_path / "cardio.csv", lines)
+    CleaningPipeline(source, ";").run()
+    features = ["bmi", "cardio"]
+    selected = CleaningPipeline(source, ";", cleaning_stages(features)).run()
+    assert list(selected.columns) == features
+    fresh_source = _write(tmp_path / "fresh" / "cardio.csv", lines)
+    assert selected.equals(
+        CleaningPipeline(fresh_source, ";", cleaning_stages(features)).run()
+    )
@@ -0,0 +1,89 @@
+from asyncio import open_connection, run, start_server
+from json import dumps, loads
+from typing import Any, Dict, List
+
+import pytest
+from logistic_regression.linear_model import CustomLogisticRegression
+
+from scripts.create_patient import CARDIO_STR
+from scripts.design import design_matrix
+from scripts.generic_methods import CARDIO_DTYPES, load_dataset
+from scripts.serving import MAX_BODY_SIZE, MicroBatcher, ScoringServer
+from tests.test_patient_frame import ORIGINAL_PATH
+
+PATIENT: Dict[str, Any] = {
+    "age": 18393,
+    "gender": 2,
+    "height": 168,
+    "weight": 62.0,
+    "ap_hi": 110,
+    "ap_lo": 80,
+    "cholesterol": 1,
+    "gluc": 1,
+    "smoke": 0,
+    "alco": 0,
+    "active": 1,
+}
+
+
+@pytest.fixture(scope="module")
+def model() -> CustomLogisticRegression:
+    dataset = load_dataset(ORIGINAL_PATH, ";", dtypes=CARDIO_DTYPES).head(2000)
+    model = CustomLogisticRegression()
+    model.fit(design_matrix(dataset), dataset[CARDIO_STR].to_numpy(), solver="lbfgs")
+    return model
+
+
+async def _exchange(model: Any, requests: List[bytes]) -> List[bytes]:
+    """Raw responses of a server of the model to requests, each one sent on
+    its own connection"""
+    batcher = MicroBatcher(model)
+    server = await start_server(ScoringServer(batcher).handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    batching = server.get_loop().create_task(batcher.run())
+    responses = []
+    try:
+        for request in requests:
+            reader, writer = await open_connection("127.0.0.1", port)
+            writer.write(request)
+            await writer.drain()
+            responses.append(await reader.read())
+            writer.close()
+    finally:
+        batching.cancel()
+        server.close()
+        batcher.executor.shutdown()
+    return responses
+
+
+def _post(body: bytes, content_length: str) -> bytes:
+    return (
+        "POST /score HTTP/1.1\r\n"
+        f"Content-Length: {content_length}\r\n"
+        "Connection: close\r\n\r\n"
+    ).encode() + body
+
+
+def _status(response: bytes) -> int:
+    return int(response.split(b" ", 2)[1])
+
+
+@pytest.mark.parametrize("content_length", ["-1", "abc", str(MAX_BODY_SIZE + 1)])
+def test_bad_content_length_is_a_bad_request(model, content_length: str) -> None:
+    (response,) = run(_exchange(model, [_post(b"{}", content_length)]))
+    assert _status(response) == 400
+
+
+def test_scores_and_rejects_patients(model) -> None:
+    body = dumps([PATIENT, PATIENT]).encode()
+    invalid = dumps({**PATIENT, "ap_lo": 80.5}).encode()
+    scored, rejected = run(
+        _exchange(
+            model,
+            [_post(body, str(len(body))), _post(invalid, str(len(invalid)))],
+        )
+    )
+    assert _status(scored) == 200
+    payload = loads(scored.split(b"\r\n\r\n", 1)[1])
+    assert len(payload["probabilities"]) == 2
+    assert _status(rejected) == 422
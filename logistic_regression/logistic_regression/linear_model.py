@@ -1,29 +1,63 @@
-from dataclasses import dataclass, field
-from typing import Callable, Tuple, TypeAlias
-from numpy import array, dot, log, mean, ndarray, exp, sum, zeros
+from json import dumps, loads
+from pathlib import Path
+from typing import Callable, Iterable, Optional, Tuple, TypeAlias
+from numpy import (
+    abs,
+    ascontiguousarray,
+    append,
+    array,
+    dot,
+    empty,
+    float32,
+    frombuffer,
+    hstack,
+    logaddexp,
+    mean,
+    multiply,
+    ndarray,
+    ones,
+    prod,
+    sqrt,
+    subtract,
+    sum,
+    tanh,
+    where,
+    zeros,
+)
+from numpy.linalg import lstsq
+
+SOLVERS = ("sgd", "newton", "lbfgs")
+FORMAT_VERSION = 1
+MAGIC = b"LOGREG01"
 
 class CustomLogisticRegression:
 
     def __init__(self, threshold = 0.5) -> None:
         self.threshold: float = threshold
-        self.__weight: ndarray = field(default_factory=lambda: zeros((1, 1)))
+        self.__weight: ndarray = zeros((1, 1))
         self.__bias: float = 0.0
         self.__losses: list = []
+        self.__mean: Optional[ndarray] = None
+        self.__variance: Optional[ndarray] = None
+        self.__standard_deviation: Optional[ndarray] = None
+        self.__number_seen: int = 0
 
     
     def _sigmoid_transform(self, values: ndarray) -> ndarray:
         """
         To return a hypotesis (self._hypothesis) between 0 & 1, logistic regressor need to apply a sigmoid_transformation to squished value in this range. It will apply
-        the sigmoid transformation to all the values of the array
+        the sigmoid transformation to all the values of the array.
+        It is computed with tanh, which never overflows (unlike e^-x for the very negative values), as fast as the direct formula.
+        The rounding differs from 1 / (1 + e^-x): the weights and probabilities differ from the ones of the direct formula by about 1e-16.
 
         Input :
             value, ndarray : the matrix of value which will be "squished"
         Output :
             ndarray, the matrix of squished value
         Mathematic expression :
-            f(x) = 1 / (1 + e^-x)
+            f(x) = 1 / (1 + e^-x) = 1/2 * tanh(x / 2) + 1/2
         """
-        return 1 / (1 + exp(-values))
+        return 0.5 * tanh(0.5 * values) + 0.5
 
     def _hypotesis(self, weight: ndarray, bias: float, dataframe: ndarray) -> ndarray:
         """
@@ -41,24 +75,45 @@ class CustomLogisticRegression:
         """
         return self._sigmoid_transform(dot(dataframe, weight) + bias)
 
-    def _lost_function(self, target_values: ndarray, hypothesis: ndarray) -> float:
+    def _hypotesis_inplace(
+        self, weight: ndarray, bias: float, dataframe: ndarray, out: ndarray
+    ) -> ndarray:
+        """
+        Same as self._hypotesis, written into a preallocated buffer with the same operations in the same order (so with the same results),
+        without allocating any temporary.
+
+        Input :
+            dataframe : ndarray, the matrix of values of the dataframe
+            weight : ndarray, the matrix of weight to be apply to the dataframe
+            bias: float, the bias to be added at the dot calc
+            out : ndarray, the (observations x 1) buffer to write into
+        Output :
+            ndarray, the buffer with the values of the sigmoid transformations of the inputs
+        Mathematic expression :
+            f(x) = 1/2 * tanh(((X . w) + b) / 2) + 1/2
+        """
+        dot(dataframe, weight, out=out)
+        out += bias
+        out *= 0.5
+        tanh(out, out=out)
+        out *= 0.5
+        out += 0.5
+        return out
+
+    def _lost_function(self, target_values: ndarray, logits: ndarray) -> float:
         """
         In the logistic regressor, the lost function or cost function is a mesure of how much the predictions differs from the labels.
-        We use the binary cross entropy for this lost function.
+        We use the binary cross entropy for this lost function. It is fused with the sigmoid and computed from the logits (X . w + b)
+        with a log-sum-exp, so a probability rounded to 0 or 1 never gives log(0).
 
         Input:
             target_values, ndarray: the matrix of the labels
-            hypothesis, ndarray : the matrix of the predicted values
+            logits, ndarray : the matrix of the predicted values before the sigmoid transformation
         Output:
             float : the mesure of how much the predictions differs from the labels
-        Mathematic expression : - 1/m * S(m, i)[(yi * log(ŷi) + (1 - yi) * log(1 - ŷi))]
+        Mathematic expression : - 1/m * S(m, i)[(yi * log(ŷi) + (1 - yi) * log(1 - ŷi))] = 1/m * S(m, i)[log(1 + e^zi) - yi * zi]
         """
-        return float(
-            -mean(
-                target_values * (log(hypothesis))
-                - (1 - target_values) * log(1 - hypothesis)
-            )
-        )
+        return float(mean(logaddexp(0, logits) - target_values * logits))
 
     def _gradient_calc(
         self, dataframe: ndarray, target_value: ndarray, hypothesis: ndarray
@@ -87,22 +142,293 @@ class CustomLogisticRegression:
 
         return lost_partial_derivative_weight, float(lost_partial_derivative_bias)
 
+    def _update_statistics(self, dataframe: ndarray) -> None:
+        """
+        The mean & variance of each feature are kept on the model to normalize the dataframes (self._normalize_dataframe).
+        For a stream of chunks, they are kept up to date with each new chunk, by merging the statistics of the chunk with the ones
+        of all the previous observations.
+
+        Input :
+            dataframe, ndarray : the matrix of the values of the new chunk
+        Output : None
+        Mathematic expression :
+            mean = mean_a + (mean_b - mean_a) * n_b / n
+            variance = (variance_a * n_a + variance_b * n_b + (mean_b - mean_a)² * n_a * n_b / n) / n
+        """
+        number_chunk_observations = len(dataframe)
+        chunk_mean, chunk_variance = (
+            dataframe.mean(axis=0, dtype=float),
+            dataframe.var(axis=0, dtype=float),
+        )
+        if self.__mean is None:
+            self.__mean, self.__variance = chunk_mean, chunk_variance
+            self.__number_seen = number_chunk_observations
+            self.__standard_deviation = where(self.__variance > 0, sqrt(self.__variance), 1.0)
+            return
+
+        number_observations = self.__number_seen + number_chunk_observations
+        delta = chunk_mean - self.__mean
+        self.__mean = self.__mean + delta * number_chunk_observations / number_observations
+        self.__variance = (
+            self.__variance * self.__number_seen
+            + chunk_variance * number_chunk_observations
+            + delta**2 * self.__number_seen * number_chunk_observations / number_observations
+        ) / number_observations
+        self.__number_seen = number_observations
+        self.__standard_deviation = where(self.__variance > 0, sqrt(self.__variance), 1.0)
+
     def _normalize_dataframe(self, dataframe: ndarray) -> ndarray:
         """
-        To get acceptable lost function values, we need to normalize our dataset.
+        To get acceptable lost function values, we need to normalize our dataset. The mean & standard deviation of each feature
+        are the ones of the training dataset (self._update_statistics), stored on the model, so a prediction on a single observation
+        is normalized the same way as the training. The dataframe is copied once as float and normalized in place, a float32 dataframe
+        (a memory-mapped design matrix for example) stays in float32 to halve the copy.
+
         Input :
             dataframe, ndarray : the matrix of the values of the dataframe
         Output :
             ndarray : the matrix of the normalized values of the dataframe
         Mathematic expression :
-            for each feature n : X(n) = X(n) - mean(X(n)) / standart deviation(X(n))
+            for each feature n : X(n) = (X(n) - mean(n)) / standart deviation(n)
+        """
+        if self.__mean is None:
+            raise Exception("The model need to have been train before predictions")
+        normalized_dataframe = array(
+            dataframe, dtype=float32 if dataframe.dtype == float32 else float
+        )
+        normalized_dataframe -= self.__mean
+        normalized_dataframe /= self.__standard_deviation
+        return normalized_dataframe
+
+    def _objective(
+        self,
+        design: ndarray,
+        target_values: ndarray,
+        parameters: ndarray,
+        l2_regularization: float,
+    ) -> Tuple[float, ndarray, ndarray]:
+        """
+        The regularized lost function of the weight & bias stacked in one vector, with its gradient, for the second order solvers.
+
+        Input :
+            design, ndarray : the matrix of the values of the dataframe, with a last column of 1 for the bias
+            target_values, ndarray : the matrix of the labels
+            parameters, ndarray : the weight followed by the bias
+            l2_regularization, float : the strength of the L2 penalty on the weight (not on the bias)
+        Output :
+            Tuple[float, ndarray, ndarray] : the regularized loss, its gradient and the hypothesis
+        Mathematic expression :
+            L(w, b) + l/2 * ||w||²
+            dL = (1 / m) * (X.T . (ŷ - y)) + l * w
+        """
+        penalized = append(parameters[:-1], 0.0)
+        logits = dot(design, parameters)
+        hypothesis = self._sigmoid_transform(logits)
+
+        loss = self._lost_function(target_values, logits) + (
+            l2_regularization / 2 * dot(penalized, penalized)
+        )
+        gradient = (
+            dot(design.T, hypothesis - target_values) / len(target_values)
+            + l2_regularization * penalized
+        )
+        return loss, gradient, hypothesis
+
+    def _fit_sgd(
+        self,
+        dataframe: ndarray,
+        target_values: ndarray,
+        batch_size: int,
+        epochs: int,
+        learning_rate: float,
+        loss_every: int,
+        l2_regularization: float,
+    ) -> None:
+        """
+        Mini-batch gradient descent. The batches are sliced once, and the hypothesis and gradients are written into preallocated buffers
+        with in-place operations.
+
+        Input :
+            dataframe, ndarray : the matrix of the normalized values of the dataset
+            target_values, ndarray : the (observations x 1) matrix of the labels
+            batch_size, int: the size of the batch to divide the dataframe
+            epochs, int : the number of iterations of the entire dataframe
+            learning_rate, float : the rate of gradient descent iteration
+            loss_every, int : the number of epochs between two calculations of the loss on the entire dataframe, 0 to never calculate it
+            l2_regularization, float : the strength of the L2 penalty on the weight
+        Output : None
+        """
+        number_observations, number_features = dataframe.shape
+        batches = [
+            (
+                dataframe[start_of_batch : start_of_batch + batch_size],
+                target_values[start_of_batch : start_of_batch + batch_size],
+            )
+            for start_of_batch in range(0, number_observations, batch_size)
+        ]
+
+        hypothesis_buffer = empty((min(batch_size, number_observations), 1))
+        partial_derivative_weight = empty((number_features, 1))
+        logits = empty((number_observations, 1))
+        weight, bias = self.__weight, self.__bias
+
+        for epoch in range(epochs):
+            for dataframe_by_batch, target_values_by_batch in batches:
+                number_batch_observations = len(target_values_by_batch)
+                hypothesis = self._hypotesis_inplace(
+                    weight,
+                    bias,
+                    dataframe_by_batch,
+                    hypothesis_buffer[:number_batch_observations],
+                )
+
+                # hypothesis - target_value, the error, is computed once in place
+                errors = subtract(hypothesis, target_values_by_batch, out=hypothesis)
+                dot(dataframe_by_batch.T, errors, out=partial_derivative_weight)
+                multiply(
+                    1 / number_batch_observations,
+                    partial_derivative_weight,
+                    out=partial_derivative_weight,
+                )
+                if l2_regularization:
+                    partial_derivative_weight += l2_regularization * weight
+                partial_derivative_weight *= learning_rate
+                partial_derivative_bias = float(
+                    (1 / number_batch_observations) * errors.sum()
+                )
+
+                weight -= partial_derivative_weight
+                bias -= learning_rate * partial_derivative_bias
+
+            if loss_every and (epoch + 1) % loss_every == 0:
+                dot(dataframe, weight, out=logits)
+                logits += bias
+                self.__losses.append(self._lost_function(target_values, logits))
+
+        self.__bias = bias
+
+    def _fit_newton(
+        self,
+        design: ndarray,
+        target_values: ndarray,
+        tolerance: float,
+        max_iterations: int,
+        l2_regularization: float,
+    ) -> ndarray:
+        """
+        Newton's method (iteratively reweighted least squares): each iteration solves the second order approximation of the loss.
+        With a few features it converges in a handful of iterations.
+
+        Input :
+            design, ndarray : the matrix of the normalized values of the dataset, with a last column of 1 for the bias
+            target_values, ndarray : the matrix of the labels
+            tolerance, float : the iterations stop when no parameter moves more than it
+            max_iterations, int : the maximum number of iterations
+            l2_regularization, float : the strength of the L2 penalty on the weight
+        Output :
+            ndarray : the weight followed by the bias
+        Mathematic expression :
+            H = (1 / m) * (X.T . diag(ŷ * (1 - ŷ)) . X) + l * I
+            (w, b) = (w, b) - H^-1 . dL
+        """
+        number_observations, number_parameters = design.shape
+        parameters = zeros(number_parameters)
+        penalty = l2_regularization * append(ones(number_parameters - 1), 0.0)
+
+        for _ in range(max_iterations):
+            _, gradient, hypothesis = self._objective(
+                design, target_values, parameters, l2_regularization
+            )
+            hessian = dot(design.T * (hypothesis * (1 - hypothesis)), design) / (
+                number_observations
+            )
+            hessian.flat[:: number_parameters + 1] += penalty
+            step = lstsq(hessian, gradient, rcond=None)[0]
+            parameters -= step
+
+            self.__losses.append(
+                self._lost_function(target_values, dot(design, parameters))
+            )
+            if abs(step).max() < tolerance:
+                break
+        return parameters
+
+    def _fit_lbfgs(
+        self,
+        design: ndarray,
+        target_values: ndarray,
+        tolerance: float,
+        max_iterations: int,
+        l2_regularization: float,
+        memory: int = 10,
+    ) -> ndarray:
         """
-        _, number_features = dataframe.shape
+        Limited-memory BFGS: the inverse of the hessian is approximated from the last parameters & gradients changes (two-loop recursion),
+        and the step is shortened until the loss decreases enough (Armijo backtracking).
 
-        for _ in range(number_features):
-            dataframe = dataframe - dataframe.mean(axis=0) / dataframe.std(axis=0)
+        Input :
+            design, ndarray : the matrix of the normalized values of the dataset, with a last column of 1 for the bias
+            target_values, ndarray : the matrix of the labels
+            tolerance, float : the iterations stop when no gradient component is larger than it
+            max_iterations, int : the maximum number of iterations
+            l2_regularization, float : the strength of the L2 penalty on the weight
+            memory (default 10), int : the number of changes kept to approximate the hessian
+        Output :
+            ndarray : the weight followed by the bias
+        """
+        parameters = zeros(design.shape[1])
+        loss, gradient, _ = self._objective(
+            design, target_values, parameters, l2_regularization
+        )
+        changes: list[Tuple[ndarray, ndarray, float]] = []
+
+        for _ in range(max_iterations):
+            if abs(gradient).max() < tolerance:
+                break
 
-        return dataframe
+            direction = -gradient
+            alphas = []
+            for parameters_change, gradient_change, rho in reversed(changes):
+                alpha = rho * dot(parameters_change, direction)
+                direction -= alpha * gradient_change
+                alphas.append(alpha)
+            if changes:
+                parameters_change, gradient_change, _ = changes[-1]
+                direction *= dot(parameters_change, gradient_change) / dot(
+                    gradient_change, gradient_change
+                )
+            for (parameters_change, gradient_change, rho), alpha in zip(
+                changes, reversed(alphas)
+            ):
+                direction += (alpha - rho * dot(gradient_change, direction)) * (
+                    parameters_change
+                )
+
+            step_size, slope = 1.0, dot(gradient, direction)
+            while True:
+                new_parameters = parameters + step_size * direction
+                new_loss, new_gradient, _ = self._objective(
+                    design, target_values, new_parameters, l2_regularization
+                )
+                if new_loss <= loss + 1e-4 * step_size * slope or step_size < 1e-10:
+                    break
+                step_size /= 2
+
+            parameters_change, gradient_change = (
+                new_parameters - parameters,
+                new_gradient - gradient,
+            )
+            curvature = dot(parameters_change, gradient_change)
+            if curvature > 1e-10:
+                changes = (changes + [(parameters_change, gradient_change, 1 / curvature)])[
+                    -memory:
+                ]
+
+            parameters, loss, gradient = new_parameters, new_loss, new_gradient
+            self.__losses.append(
+                self._lost_function(target_values, dot(design, parameters))
+            )
+        return parameters
 
     def fit(
         self,
@@ -111,53 +437,138 @@ class CustomLogisticRegression:
         batch_size: int = 100,
         epochs: int = 1000,
         learning_rate: float = 0.01,
+        loss_every: int = 1,
+        solver: str = "sgd",
+        tolerance: float = 1e-6,
+        max_iterations: int = 100,
+        l2_regularization: float = 0.0,
     ) -> None:
         """
         Method to fit the logistic regressor to the dataset. It will enables to find the optimal weight & bias for the classification.
-        By iteratin epochs & batch, it will calculate the hypothesis and use gradient descent to optimize weight & bias.
+        With the "sgd" solver, by iteratin epochs & batch, it will calculate the hypothesis and use gradient descent to optimize weight & bias.
+        The "newton" and "lbfgs" solvers use the whole dataset at each iteration with second order informations, and stop once converged.
+        The loss on the entire dataframe is kept after each epoch (sgd) or iteration (newton, lbfgs).
 
         Input :
             dataframe, ndarray : the matrix of value of the dataset
             target_values, ndarray : the matrix of the labels
-            batch_size (default 100), int: the size of the batch to divide the dataframe
-            epochs (default 1000), int : the number of iterations of the entire dataframe
-            learning_rate (default 0.01), float : the rate of gradient descent iteration
+            batch_size (default 100), int: the size of the batch to divide the dataframe (sgd)
+            epochs (default 1000), int : the number of iterations of the entire dataframe (sgd)
+            learning_rate (default 0.01), float : the rate of gradient descent iteration (sgd)
+            loss_every (default 1), int : the number of epochs between two calculations of the loss on the entire dataframe, 0 to never calculate it (sgd)
+            solver (default "sgd"), str : the optimizer, one of "sgd", "newton" or "lbfgs"
+            tolerance (default 1e-6), float : the convergence tolerance on the parameters change (newton) or the gradient (lbfgs)
+            max_iterations (default 100), int : the maximum number of iterations (newton, lbfgs)
+            l2_regularization (default 0), float : the strength of the L2 penalty on the weight
         Output : None
         """
+        if solver not in SOLVERS:
+            raise ValueError(f"Unknown solver {solver}, expected one of {SOLVERS}")
 
         number_observations, number_features = dataframe.shape
 
         self.__weight = zeros((number_features, 1))
         self.__bias = 0.0
         self.__losses = []
+        self.__mean, self.__variance, self.__number_seen = None, None, 0
 
-        target_values = target_values.reshape(number_observations, 1)
+        self._update_statistics(dataframe)
         dataframe = self._normalize_dataframe(dataframe)
 
-        for _ in range(epochs):
-            for batch in range((number_observations - 1) // batch_size + 1):
+        if solver == "sgd":
+            self._fit_sgd(
+                dataframe,
+                target_values.reshape(number_observations, 1).astype(float),
+                batch_size,
+                epochs,
+                learning_rate,
+                loss_every,
+                l2_regularization,
+            )
+            return
 
-                start_of_batch = batch * batch_size
-                end_of_batch = start_of_batch + batch_size
-                dataframe_by_batch = dataframe[start_of_batch:end_of_batch]
-                target_values_by_batch = target_values[start_of_batch:end_of_batch]
+        design = hstack((dataframe, ones((number_observations, 1))))
+        solve = self._fit_newton if solver == "newton" else self._fit_lbfgs
+        parameters = solve(
+            design,
+            target_values.reshape(number_observations).astype(float),
+            tolerance,
+            max_iterations,
+            l2_regularization,
+        )
+        self.__weight = parameters[:-1].reshape(number_features, 1)
+        self.__bias = float(parameters[-1])
 
-                hypothesis = self._hypotesis(
-                    self.__weight, self.__bias, dataframe_by_batch
-                )
-                partial_derivative_weight, partial_derivative_bias = (
-                    self._gradient_calc(
-                        dataframe_by_batch, target_values_by_batch, hypothesis
-                    )
-                )
+    def partial_fit(
+        self,
+        dataframe: ndarray,
+        target_values: ndarray,
+        batch_size: int = 100,
+        epochs: int = 1,
+        learning_rate: float = 0.01,
+        l2_regularization: float = 0.0,
+    ) -> None:
+        """
+        Method to continue the training of the logistic regressor on a new chunk of the dataset, with the "sgd" solver.
+        The normalization statistics are updated with the chunk before it is normalized, and the weight & bias
+        go on from their previous values. The loss on the chunk is kept after it.
 
-                self.__weight -= learning_rate * partial_derivative_weight
-                self.__bias -= learning_rate * partial_derivative_bias
+        Input :
+            dataframe, ndarray : the matrix of value of the chunk
+            target_values, ndarray : the matrix of the labels of the chunk
+            batch_size (default 100), int: the size of the batch to divide the chunk
+            epochs (default 1), int : the number of iterations of the chunk
+            learning_rate (default 0.01), float : the rate of gradient descent iteration
+            l2_regularization (default 0), float : the strength of the L2 penalty on the weight
+        Output : None
+        """
+        number_observations, number_features = dataframe.shape
+        if self.__mean is None or len(self.__mean) != number_features:
+            self.__weight = zeros((number_features, 1))
+            self.__bias = 0.0
+            self.__losses = []
+            self.__mean, self.__variance, self.__number_seen = None, None, 0
 
-            self.__losses.append(
-                self._lost_function(
-                    target_values, self._hypotesis(self.__weight, self.__bias, dataframe)
-                )
+        self._update_statistics(dataframe)
+        self._fit_sgd(
+            self._normalize_dataframe(dataframe),
+            target_values.reshape(number_observations, 1).astype(float),
+            batch_size,
+            epochs,
+            learning_rate,
+            epochs,
+            l2_regularization,
+        )
+
+    def fit_stream(
+        self,
+        chunks: Iterable[Tuple[ndarray, ndarray]],
+        batch_size: int = 100,
+        epochs: int = 1,
+        learning_rate: float = 0.01,
+        l2_regularization: float = 0.0,
+    ) -> None:
+        """
+        Method to fit the logistic regressor on a dataset too large for the memory, one chunk at a time (self.partial_fit),
+        for example from load_dataset(path, sep, chunk_size). Only one chunk is in memory at once.
+
+        Input :
+            chunks, Iterable[Tuple[ndarray, ndarray]] : the matrix of value and the matrix of the labels of each chunk
+            batch_size (default 100), int: the size of the batch to divide the chunks
+            epochs (default 1), int : the number of iterations of each chunk
+            learning_rate (default 0.01), float : the rate of gradient descent iteration
+            l2_regularization (default 0), float : the strength of the L2 penalty on the weight
+        Output : None
+        """
+        self.__mean, self.__variance, self.__number_seen = None, None, 0
+        for dataframe, target_values in chunks:
+            self.partial_fit(
+                dataframe,
+                target_values,
+                batch_size,
+                epochs,
+                learning_rate,
+                l2_regularization,
             )
 
     def predict(self, dataframe: ndarray) -> ndarray:
@@ -170,13 +581,11 @@ class CustomLogisticRegression:
             ndarray : the matrix of the predicted labels
         """
         dataframe = self._normalize_dataframe(dataframe)
-        predictions = self._hypotesis(self.__weight, self.__bias, dataframe)
-
-        predictions_classified = [
-            1 if prediction > self.threshold else 0 for prediction in predictions
-        ]
+        predictions = self._hypotesis_inplace(
+            self.__weight, self.__bias, dataframe, empty((len(dataframe), 1))
+        )
 
-        return array(predictions_classified)
+        return (predictions.ravel() > self.threshold).astype(int)
     
 
     def predict_proba(self, dataframe: ndarray) -> ndarray:
@@ -189,4 +598,79 @@ class CustomLogisticRegression:
             ndarray : the matrix of probability to be labelized.
         """
         dataframe = self._normalize_dataframe(dataframe)
-        return  array(self._hypotesis(self.__weight, self.__bias, dataframe))
\ No newline at end of file
+        return self._hypotesis_inplace(
+            self.__weight, self.__bias, dataframe, empty((len(dataframe), 1))
+        )
+
+    def save(self, path: str | Path) -> None:
+        """
+        Save the trained model in a binary file: a json header (format version, threshold, shapes) followed by the float64 bytes
+        of the weight, the normalization statistics and the losses. Nothing is pickled.
+
+        Input :
+            path, str | Path : the path of the file
+        Output : None
+        """
+        if self.__mean is None:
+            raise Exception("The model need to have been train before saving")
+        arrays = {
+            "weight": self.__weight,
+            "mean": self.__mean,
+            "variance": self.__variance,
+            "losses": array(self.__losses, dtype=float),
+        }
+        header = dumps(
+            {
+                "format_version": FORMAT_VERSION,
+                "model": type(self).__name__,
+                "threshold": self.threshold,
+                "bias": self.__bias,
+                "number_seen": self.__number_seen,
+                "shapes": {name: list(values.shape) for name, values in arrays.items()},
+            }
+        ).encode()
+        with open(path, "wb") as file:
+            file.write(MAGIC)
+            file.write(len(header).to_bytes(4, "little"))
+            file.write(header)
+            for values in arrays.values():
+                file.write(ascontiguousarray(values, dtype="<f8").tobytes())
+
+    @classmethod
+    def load(cls, path: str | Path) -> "CustomLogisticRegression":
+        """
+        Load a model saved by save.
+
+        Input :
+            path, str | Path : the path of the file
+        Output :
+            CustomLogisticRegression : the trained model
+        """
+        content = Path(path).read_bytes()
+        if content[: len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a {cls.__name__} file")
+        header_length = int.from_bytes(content[len(MAGIC) : len(MAGIC) + 4], "little")
+        header = loads(content[len(MAGIC) + 4 : len(MAGIC) + 4 + header_length])
+        if header["format_version"] > FORMAT_VERSION or header["model"] != cls.__name__:
+            raise ValueError(
+                f"{path} holds a {header['model']} of format version {header['format_version']}, "
+                f"expected a {cls.__name__} up to version {FORMAT_VERSION}"
+            )
+
+        arrays, offset = {}, len(MAGIC) + 4 + header_length
+        for name, shape in header["shapes"].items():
+            number_values = int(prod(shape))
+            arrays[name] = (
+                frombuffer(content, dtype="<f8", count=number_values, offset=offset)
+                .reshape(shape)
+                .copy()
+            )
+            offset += 8 * number_values
+
+        model = cls(threshold=header["threshold"])
+        model.__weight, model.__bias = arrays["weight"], float(header["bias"])
+        model.__mean, model.__variance = arrays["mean"], arrays["variance"]
+        model.__standard_deviation = where(model.__variance > 0, sqrt(model.__variance), 1.0)
+        model.__losses = arrays["losses"].tolist()
+        model.__number_seen = header["number_seen"]
+        return model
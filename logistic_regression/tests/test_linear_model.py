@@ -0,0 +1,40 @@
+import warnings
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from logistic_regression.linear_model import SOLVERS, CustomLogisticRegression
+
+
+def _dataset() -> tuple[np.ndarray, np.ndarray]:
+    generator = np.random.default_rng(0)
+    dataframe = generator.normal(size=(2000, 5))
+    target_values = (
+        dataframe @ generator.normal(size=5) + generator.normal(size=2000) > 0
+    ).astype(int)
+    return dataframe, target_values
+
+
+@pytest.mark.parametrize("solver", SOLVERS)
+def test_saved_model_predicts_the_same(solver: str, tmp_path: Path) -> None:
+    dataframe, target_values = _dataset()
+    model = CustomLogisticRegression(threshold=0.4)
+    model.fit(dataframe, target_values, solver=solver, epochs=5)
+    model.save(tmp_path / "model.bin")
+    loaded = CustomLogisticRegression.load(tmp_path / "model.bin")
+    assert loaded.threshold == 0.4
+    assert np.array_equal(
+        loaded.predict_proba(dataframe), model.predict_proba(dataframe)
+    )
+    assert np.array_equal(loaded.predict(dataframe), model.predict(dataframe))
+
+
+def test_extreme_logits_do_not_overflow() -> None:
+    dataframe, target_values = _dataset()
+    model = CustomLogisticRegression()
+    model.fit(dataframe, target_values, solver="lbfgs")
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        probabilities = model.predict_proba(dataframe * 1e4)
+    assert probabilities.min() == 0.0 and probabilities.max() == 1.0
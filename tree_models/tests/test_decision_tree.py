@@ -0,0 +1,72 @@
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pytest
+
+from tree_models.decision_tree import CustomDecisionTree, Node
+
+DATASET_PATH = Path(__file__).parents[2] / "data" / "filtered" / "cardio_train.csv"
+
+# preorder (feature, threshold) of the nodes and (None, value) of the leafs of the
+# baseline CustomDecisionTree(maximum_depth=3) fitted on the first 400 rows of the
+# filtered dataset after numpy.random.seed(0)
+BASELINE_TREE = [
+    (4, 133.0), (0, 19758.0), (6, 2.0), (5, 70.0), (None, 0.0), (None, 0.0),
+    (2, 164.0), (None, 0.0), (None, 1.0), (6, 2.0), (5, 70.0), (None, 0.0),
+    (None, 1.0), (3, 92.0), (None, 1.0), (None, 1.0), (5, 90.0), (2, 155.0),
+    (0, 21059.0), (None, 0.0), (None, 1.0), (2, 173.0), (None, 1.0), (None, 1.0),
+    (1, 0.0), (None, 0.0), (None, 1.0),
+]  # fmt: skip
+
+
+def filtered_rows(number_rows: int) -> tuple[np.ndarray, np.ndarray]:
+    """Features and labels of the first rows of the filtered dataset"""
+    names = DATASET_PATH.open().readline().strip().split(",")
+    values = np.genfromtxt(
+        DATASET_PATH, delimiter=",", skip_header=1, max_rows=number_rows, dtype=str
+    )
+    values = np.where(values == "True", "1", np.where(values == "False", "0", values))
+    values = values.astype(float)
+    features = [
+        position for position, name in enumerate(names) if name not in ("id", "cardio")
+    ]
+    return values[:, features], values[:, names.index("cardio")].astype(int)
+
+
+def _preorder(node: Node) -> list[tuple[Optional[int], float]]:
+    if node.left is None:
+        return [(None, float(node.value))]
+    return (
+        [(int(node.feature), float(node.threshold))]
+        + _preorder(node.left)
+        + _preorder(node.right)
+    )
+
+
+def test_global_seed_reproduces_the_baseline_tree() -> None:
+    dataframe, target_values = filtered_rows(400)
+    np.random.seed(0)
+    tree = CustomDecisionTree(maximum_depth=3)
+    tree.fit(dataframe, target_values)
+    assert _preorder(tree.root) == BASELINE_TREE
+
+
+@pytest.mark.parametrize("max_bins", [None, 32])
+def test_random_state_ignores_the_global_seed(max_bins: Optional[int]) -> None:
+    dataframe, target_values = filtered_rows(2000)
+    trees = []
+    for global_seed in range(2):
+        np.random.seed(global_seed)
+        tree = CustomDecisionTree(maximum_depth=6, max_features=4, random_state=7)
+        tree.fit(dataframe, target_values, max_bins)
+        trees.append(_preorder(tree.root))
+    assert trees[0] == trees[1]
+
+
+def test_flat_tree_predicts_as_the_nodes() -> None:
+    dataframe, target_values = filtered_rows(2000)
+    tree = CustomDecisionTree(maximum_depth=6, random_state=0)
+    tree.fit(dataframe, target_values)
+    walked = [tree._traverse_tree(serie, tree.root) for serie in dataframe]
+    assert np.array_equal(tree.predict(dataframe).ravel(), walked)
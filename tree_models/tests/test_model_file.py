@@ -0,0 +1,61 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from tree_models import design_matrix
+from tree_models.decision_tree import CustomDecisionTree
+from tree_models.design_matrix import open_design_matrix, write_design_matrix
+from tree_models.gradient_boosting import CustomGradientBoosting
+from tree_models.random_forest import CustomRandomForest
+from tests.test_decision_tree import filtered_rows
+
+
+@pytest.mark.parametrize(
+    "model",
+    [
+        CustomDecisionTree(maximum_depth=5, random_state=0),
+        CustomRandomForest(number_trees=4, maximum_depth=4, random_state=0),
+        CustomGradientBoosting(number_rounds=10, random_state=0),
+    ],
+    ids=type,
+)
+def test_saved_model_predicts_the_same(model, tmp_path: Path) -> None:
+    dataframe, target_values = filtered_rows(2000)
+    model.fit(dataframe, target_values)
+    model.save(tmp_path / "model.bin")
+    loaded = type(model).load(tmp_path / "model.bin")
+    assert np.array_equal(loaded.predict(dataframe), model.predict(dataframe))
+
+
+def test_load_rejects_another_model(tmp_path: Path) -> None:
+    dataframe, target_values = filtered_rows(500)
+    tree = CustomDecisionTree(maximum_depth=3, random_state=0)
+    tree.fit(dataframe, target_values)
+    tree.save(tmp_path / "tree.bin")
+    with pytest.raises(ValueError, match="not a CustomRandomForest"):
+        CustomRandomForest.load(tmp_path / "tree.bin")
+
+
+def test_design_matrix_round_trip(tmp_path: Path) -> None:
+    dataframe, target_values = filtered_rows(1000)
+    names = [f"feature_{position}" for position in range(dataframe.shape[1])]
+    write_design_matrix(tmp_path / "matrix.bin", dataframe, target_values, names)
+    matrix = open_design_matrix(tmp_path / "matrix.bin")
+    assert np.array_equal(matrix.features, dataframe.astype(np.float32))
+    assert np.array_equal(matrix.labels, target_values)
+    assert matrix.feature_names == names
+
+
+def test_design_matrix_of_a_newer_version_is_rejected(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    dataframe, target_values = filtered_rows(10)
+    newer_version = design_matrix.FORMAT_VERSION + 1
+    monkeypatch.setattr(design_matrix, "FORMAT_VERSION", newer_version)
+    write_design_matrix(tmp_path / "matrix.bin", dataframe, target_values)
+    monkeypatch.undo()
+    with pytest.raises(ValueError, match="format version"):
+        open_design_matrix(tmp_path / "matrix.bin")
+    with pytest.raises(ValueError, match="not a model file"):
+        CustomDecisionTree.load(tmp_path / "matrix.bin")
@@ -0,0 +1,32 @@
+from typing import Optional
+
+import numpy as np
+import pytest
+
+from tree_models.random_forest import CustomRandomForest
+from tests.test_decision_tree import filtered_rows
+
+
+@pytest.mark.parametrize("max_bins", [None, 32])
+def test_predictions_do_not_depend_on_n_jobs(max_bins: Optional[int]) -> None:
+    dataframe, target_values = filtered_rows(3000)
+    predictions = []
+    for n_jobs in (None, 1, 2, -1):
+        forest = CustomRandomForest(
+            number_trees=6, maximum_depth=5, n_jobs=n_jobs, random_state=3
+        )
+        forest.fit(dataframe, target_values, max_bins)
+        predictions.append(forest.predict_proba(dataframe))
+    for other in predictions[1:]:
+        assert np.array_equal(predictions[0], other)
+
+
+def test_fit_leaves_the_global_seed_untouched() -> None:
+    dataframe, target_values = filtered_rows(1000)
+    np.random.seed(0)
+    expected = np.random.random()
+    np.random.seed(0)
+    CustomRandomForest(number_trees=3, maximum_depth=3, random_state=0).fit(
+        dataframe, target_values
+    )
+    assert np.random.random() == expected
@@ -0,0 +1,109 @@
+"""Benchmark of the gradient boosting against a single decision tree.
+
+Usage:
+    python -m tree_models.benchmark ../data/filtered/cardio_train.csv
+"""
+
+from argparse import ArgumentParser
+from time import perf_counter
+from numpy import column_stack, genfromtxt, mean, ndarray, random
+
+from tree_models.decision_tree import CustomDecisionTree
+from tree_models.gradient_boosting import CustomGradientBoosting
+
+_IGNORED_COLUMNS = ("id",)
+_TARGET_COLUMN = "cardio"
+
+
+def load_matrix(path: str, delimiter: str) -> tuple[ndarray, ndarray]:
+    """
+    Function to read a cardio dataset into a float matrix of features and the labels.
+
+    Input:
+        path, str: the path of the csv file
+        delimiter, str: the separator of the csv file
+    Output:
+        tuple[ndarray, ndarray]: the features and the labels
+    """
+    dataset = genfromtxt(path, delimiter=delimiter, names=True, dtype=None, encoding=None)
+    features = [
+        name
+        for name in dataset.dtype.names
+        if name not in _IGNORED_COLUMNS and name != _TARGET_COLUMN
+    ]
+    dataframe = column_stack([dataset[name].astype(float) for name in features])
+    return dataframe, dataset[_TARGET_COLUMN].astype(int)
+
+
+def benchmark(
+    dataframe: ndarray, target_values: ndarray, seed: int = 0
+) -> dict[str, dict[str, float]]:
+    """
+    Function to train and score each model on the same split (60% train, 20% validation, 20% test).
+
+    Input:
+        dataframe, ndarray: The matrix of the values of the dataframe
+        target_values, ndarray: The matrix of the target labels
+        seed (default 0), int: the seed of the split and of the models
+    Output:
+        dict[str, dict[str, float]]: the fit time, the number of trees and the test accuracy of each model
+    """
+    order = random.default_rng(seed).permutation(len(target_values))
+    train, validation, test = (
+        order[: int(0.6 * len(order))],
+        order[int(0.6 * len(order)) : int(0.8 * len(order))],
+        order[int(0.8 * len(order)) :],
+    )
+    models = {
+        "decision_tree": (
+            CustomDecisionTree(maximum_depth=8, random_state=seed),
+            {},
+        ),
+        "decision_tree_binned": (
+            CustomDecisionTree(maximum_depth=8, random_state=seed),
+            {"max_bins": 64},
+        ),
+        "gradient_boosting": (
+            CustomGradientBoosting(
+                number_rounds=300,
+                maximum_depth=4,
+                subsample=0.8,
+                early_stopping_rounds=10,
+                random_state=seed,
+            ),
+            {
+                "validation_dataframe": dataframe[validation],
+                "validation_target_values": target_values[validation],
+            },
+        ),
+    }
+
+    results = {}
+    for name, (model, fit_parameters) in models.items():
+        start = perf_counter()
+        model.fit(dataframe[train], target_values[train], **fit_parameters)
+        fit_time = perf_counter() - start
+        results[name] = {
+            "fit_seconds": fit_time,
+            "number_trees": len(getattr(model, "flat_trees", [None])),
+            "accuracy": float(
+                mean(model.predict(dataframe[test]) == target_values[test])
+            ),
+        }
+    return results
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", help="csv file in the cardio_train schema")
+    parser.add_argument("--delimiter", default=",")
+    arguments = parser.parse_args()
+
+    for model_name, scores in benchmark(
+        *load_matrix(arguments.path, arguments.delimiter)
+    ).items():
+        print(
+            f"{model_name:<22} fit {scores['fit_seconds']:8.3f}s"
+            f"  {scores['number_trees']:4d} trees"
+            f"  accuracy {scores['accuracy']:.4f}"
+        )
@@ -1,6 +1,39 @@
 from dataclasses import dataclass
+from pathlib import Path
 from typing import Optional
-from numpy import argmax, argwhere, array, bincount, log2, ndarray, random, unique, sum
+from numpy import (
+    append,
+    arange,
+    argmax,
+    argsort,
+    argwhere,
+    array,
+    bincount,
+    concatenate,
+    count_nonzero,
+    cumsum,
+    errstate,
+    flatnonzero,
+    full,
+    inf,
+    intp,
+    linspace,
+    nan,
+    log2,
+    ndarray,
+    percentile,
+    random,
+    searchsorted,
+    uint8,
+    unique,
+    sum,
+    where,
+    zeros,
+)
+
+from tree_models.model_file import load_model_file, save_model_file
+
+MAXIMUM_BINS = 256
 
 
 class Node:
@@ -22,27 +55,148 @@ class Node:
         self.right = right
 
 
+@dataclass
+class FlatTree:
+    """
+    The tree compiled into parallel arrays, indexed by node (the root is the node 0).
+    The leafs have -1 as left and right child, the inner nodes have nan as value.
+    """
+
+    feature: ndarray
+    threshold: ndarray
+    left: ndarray
+    right: ndarray
+    value: ndarray
+
+    def apply(
+        self, dataframe: ndarray, rows: ndarray, nodes: ndarray
+    ) -> ndarray:
+        """
+        Function to route observations from starting nodes to their leaf, one level of the tree at a time.
+
+        Input:
+            dataframe, ndarray: The matrix of the values of the dataframe
+            rows, ndarray: the observation of the dataframe of each walk-through
+            nodes, ndarray: the starting node of each walk-through
+        Output:
+            ndarray: the index of the leaf of each walk-through
+        """
+        leafs = nodes.copy()
+        walking = flatnonzero(self.left[leafs] >= 0)
+        while len(walking):
+            nodes = leafs[walking]
+            goes_left = (
+                dataframe[rows[walking], self.feature[nodes]] <= self.threshold[nodes]
+            )
+            leafs[walking] = where(goes_left, self.left[nodes], self.right[nodes])
+            walking = walking[self.left[leafs[walking]] >= 0]
+        return leafs
+
+    @staticmethod
+    def concatenate(flat_trees: list["FlatTree"]) -> tuple["FlatTree", ndarray]:
+        """
+        Function to merge several trees into a single one, to walk them all at once.
+
+        Input:
+            flat_trees, list[FlatTree]: the trees to merge
+        Output:
+            tuple[FlatTree, ndarray]: the merged tree and the index of the root of each tree into it
+        """
+        roots = cumsum([0] + [len(flat_tree.value) for flat_tree in flat_trees])[:-1]
+        children = {
+            side: concatenate(
+                [
+                    where(getattr(flat_tree, side) >= 0, getattr(flat_tree, side) + root, -1)
+                    for flat_tree, root in zip(flat_trees, roots)
+                ]
+            )
+            for side in ("left", "right")
+        }
+        merged_tree = FlatTree(
+            feature=concatenate([flat_tree.feature for flat_tree in flat_trees]),
+            threshold=concatenate([flat_tree.threshold for flat_tree in flat_trees]),
+            value=concatenate([flat_tree.value for flat_tree in flat_trees]),
+            **children,
+        )
+        return merged_tree, roots
+
+    @staticmethod
+    def pack(flat_trees: list["FlatTree"]) -> dict[str, ndarray]:
+        """
+        Function to lay several trees end to end in arrays, each tree keeping its own node numbers, to save them.
+
+        Input:
+            flat_trees, list[FlatTree]: the trees to pack
+        Output:
+            dict[str, ndarray]: the concatenated arrays of the trees and the number of nodes of each tree
+        """
+        arrays = {
+            name: concatenate([getattr(flat_tree, name) for flat_tree in flat_trees])
+            for name in ("feature", "threshold", "left", "right", "value")
+        }
+        arrays["number_nodes"] = array(
+            [len(flat_tree.value) for flat_tree in flat_trees], dtype=intp
+        )
+        return arrays
+
+    @staticmethod
+    def unpack(arrays: dict[str, ndarray]) -> list["FlatTree"]:
+        """
+        Function to get back the trees of FlatTree.pack, as views of the arrays (without copy).
+
+        Input:
+            arrays, dict[str, ndarray]: the arrays of FlatTree.pack
+        Output:
+            list[FlatTree]: the trees
+        """
+        ends = cumsum(arrays["number_nodes"])
+        return [
+            FlatTree(
+                **{
+                    name: arrays[name][end - number_nodes : end]
+                    for name in ("feature", "threshold", "left", "right", "value")
+                }
+            )
+            for number_nodes, end in zip(arrays["number_nodes"].tolist(), ends.tolist())
+        ]
+
+
 class CustomDecisionTree:
 
-    def __init__(self, maximum_depth=100, min_samples_split=2) -> None:
+    def __init__(
+        self,
+        maximum_depth=100,
+        min_samples_split=2,
+        max_features=None,
+        random_state=None,
+    ) -> None:
         self.maximum_depth: int = maximum_depth
         self.minimum_sample_split: int = min_samples_split
+        self.maximum_features: Optional[int] = max_features
+        self.random_state: Optional[int | random.Generator] = random_state
+        # a split is kept only when its gain is above it, any split for the information gains which are never negative
+        self.minimum_split_gain: float = -1.0
         self.root: Optional[Node] = None
+        self.flat_tree: Optional[FlatTree] = None
         self.number_samples: int = 0
         self.number_features: int = 0
         self.number_class_labels: int = 0
+        self.number_labels: int = 0
+        self.bin_edges: Optional[ndarray] = None
 
-    def _is_finished(self, depth: float) -> bool:
+    def _is_finished(self, depth: float, target_values: ndarray) -> bool:
         """
         Boolean function if the walkthrough is finished (in optic to return the most common label)
 
         Input:
             depth, float : the defined depth into the tree walkthrough
+            target_values, ndarray: The matrix of the target labels of the node
         Output:
             bool : is the walkthrough finished
         Conditions:
             maximum_depth exedeed, minimum_sample_split insufficient or unique class label
         """
+        self.number_class_labels = len(unique(target_values))
         return (
             depth > self.maximum_depth
             or self.number_samples < self.minimum_sample_split
@@ -114,36 +268,226 @@ class CustomDecisionTree:
         ) + right_length / total_length * self._entropy(target_values[right_indexes])
         return parent_loss - child_loss
 
+    def _entropies(self, class_counts: ndarray) -> ndarray:
+        """
+        Vectorized version of self._entropy, it calculates the entropy of every class counts of a matrix at once.
+
+        Input:
+            class_counts, ndarray: The matrix (... x labels) of the number of observations of each label
+        Output:
+            ndarray: the entropy of each class counts, 0 for the empty ones
+        Mathematics expression:
+            Sum(i -> n)P(xi)*logp(xi)
+        """
+        with errstate(divide="ignore", invalid="ignore"):
+            proportions = class_counts / class_counts.sum(axis=-1, keepdims=True)
+            return -sum(
+                where(proportions > 0, proportions * log2(proportions), 0.0), axis=-1
+            )
+
+    def _information_gains(
+        self, left_counts: ndarray, parent_counts: ndarray
+    ) -> ndarray:
+        """
+        Vectorized version of self._information_gain, from the class counts of the left children of every candidate split.
+
+        Input:
+            left_counts, ndarray: The matrix (... x labels) of the class counts of the left children
+            parent_counts, ndarray: The matrix (labels) of the class counts of the parent
+        Output:
+            ndarray: the information gain of each candidate split, 0 when a child is empty
+        Mathematics expression:
+            E(parent) - ( E(left_child) * (length_left_child / length_parent) + E(right_child) * (length_right_child / length_parent) )
+        """
+        right_counts = parent_counts - left_counts
+        total_length = parent_counts.sum()
+        left_lengths, right_lengths = left_counts.sum(axis=-1), right_counts.sum(axis=-1)
+
+        parent_loss = self._entropies(parent_counts)
+        child_loss = left_lengths / total_length * self._entropies(
+            left_counts
+        ) + right_lengths / total_length * self._entropies(right_counts)
+        return where(
+            (left_lengths == 0) | (right_lengths == 0), 0.0, parent_loss - child_loss
+        )
+
+    def _split_gains(
+        self, dataframe_by_feature: ndarray, target_values: ndarray
+    ) -> tuple[ndarray, ndarray]:
+        """
+        Function to calculate the information gain of every threshold of a feature in one pass.
+        The feature is sorted once, the class counts of the left children are the cumulative sum of the labels in this order.
+
+        Input:
+            dataframe_by_feature, ndarray: The matrix of the values of one feature
+            target_values, ndarray: The matrix of the target labels
+        Output:
+            tuple[ndarray, ndarray]: the sorted unique thresholds and their information gain
+        """
+        number_samples = len(target_values)
+        labels = target_values.astype(int)
+        order = argsort(dataframe_by_feature, kind="stable")
+        sorted_values = dataframe_by_feature[order]
+
+        labels_by_sample = zeros((number_samples, labels.max() + 1), dtype=int)
+        labels_by_sample[arange(number_samples), labels[order]] = 1
+        cumulative_counts = cumsum(labels_by_sample, axis=0)
+
+        # Last position of each unique value: everything before is <= threshold
+        last_positions = append(
+            flatnonzero(sorted_values[1:] != sorted_values[:-1]), number_samples - 1
+        )
+        gains = self._information_gains(
+            cumulative_counts[last_positions], cumulative_counts[-1]
+        )
+        return sorted_values[last_positions], gains
+
     def _best_split(
-        self, dataframe: ndarray, target_values: ndarray, features: ndarray
+        self,
+        dataframe: ndarray,
+        target_values: ndarray,
+        features: ndarray,
+        indexes: ndarray,
     ) -> tuple[int, float]:
         """
         Function to find the best split with specific feature and threshold.
+        Ties are kept on the first feature and the lowest threshold, as a walk-through of self._information_gain would do.
 
         Input:
             dataframe, ndarray: The matrix of the values of the dataframe
             target_values, ndarray: The matrix of the target labels
             features, float: the matrix of  indexes of features
+            indexes, ndarray: the indexes of the observations of the node
         Output:
-            tuple[int, float]: The best feature index and the best threshold
+            tuple[int, float]: The best feature index and the best threshold, None when no gain is above self.minimum_split_gain
         """
-        split = {"score": -1, "feature": None, "threshold": None}
+        split = {"score": self.minimum_split_gain, "feature": None, "threshold": None}
+        target_values = target_values[indexes]
 
         for feature in features:
-            dataframe_by_feature = dataframe[:, feature]
-            thresholds = unique(dataframe_by_feature)
-            for threshold in thresholds:
-                score = self._information_gain(
-                    dataframe_by_feature, target_values, threshold
-                )
+            thresholds, scores = self._split_gains(
+                dataframe[indexes, feature], target_values
+            )
+            best_index = argmax(scores)
 
-                if score > split["score"]:
-                    split["score"] = score
-                    split["feature"] = feature
-                    split["threshold"] = threshold
+            if scores[best_index] > split["score"]:
+                split["score"] = scores[best_index]
+                split["feature"] = feature
+                split["threshold"] = thresholds[best_index]
 
         return split["feature"], split["threshold"]
 
+    def _bin_dataframe(self, dataframe: ndarray, max_bins: int) -> ndarray:
+        """
+        Function to quantize each feature once into at most max_bins bins. The features with few unique values keep one bin per value,
+        the others are cut at their quantiles.
+
+        Input:
+            dataframe, ndarray: The matrix of the values of the dataframe
+            max_bins, int: the maximum number of bins per feature (at most 256 to fit in uint8)
+        Output:
+            ndarray: The matrix of the bin of each value of the dataframe
+        Self output:
+            self.bin_edges, ndarray : the (features x bins) matrix of the highest value of each bin, padded with inf
+        """
+        if not 2 <= max_bins <= MAXIMUM_BINS:
+            raise ValueError(f"max_bins must be between 2 and {MAXIMUM_BINS}")
+
+        edges_by_feature = []
+        for dataframe_by_feature in dataframe.T:
+            edges = unique(dataframe_by_feature)
+            if len(edges) > max_bins:
+                edges = unique(
+                    percentile(
+                        dataframe_by_feature,
+                        linspace(0, 100, max_bins + 1)[1:],
+                        method="inverted_cdf",
+                    )
+                )
+            edges_by_feature.append(edges)
+
+        self.bin_edges = full(
+            (len(edges_by_feature), max(len(edges) for edges in edges_by_feature)), inf
+        )
+        binned_dataframe = zeros(dataframe.shape, dtype=uint8)
+        for feature, edges in enumerate(edges_by_feature):
+            self.bin_edges[feature, : len(edges)] = edges
+            binned_dataframe[:, feature] = searchsorted(edges, dataframe[:, feature])
+        return binned_dataframe
+
+    def _histogram(
+        self, binned_dataframe: ndarray, target_values: ndarray, indexes: ndarray
+    ) -> ndarray:
+        """
+        Function to count the labels of each bin of each feature with a single bincount.
+
+        Input:
+            binned_dataframe, ndarray: The matrix of the bins of the dataframe
+            target_values, ndarray: The matrix of the target labels
+            indexes, ndarray: the indexes of the observations of the node
+        Output:
+            ndarray: the (features x bins x labels) matrix of class counts
+        """
+        number_features, number_bins = self.bin_edges.shape
+        cells = (
+            arange(number_features) * number_bins + binned_dataframe[indexes]
+        ) * self.number_labels + target_values[indexes].reshape(-1, 1)
+        return bincount(
+            cells.ravel(), minlength=number_features * number_bins * self.number_labels
+        ).reshape(number_features, number_bins, self.number_labels)
+
+    def _best_histogram_split(
+        self, histogram: ndarray, features: ndarray
+    ) -> tuple[int, int]:
+        """
+        Function to find the best split from the class histograms of a node, the same way as self._best_split.
+
+        Input:
+            histogram, ndarray: the (features x bins x labels) matrix of class counts of the node
+            features, float: the matrix of  indexes of features
+        Output:
+            tuple[int, int]: The best feature index and the best bin (the left child keeps the bins <= it), None when no gain is above self.minimum_split_gain
+        """
+        left_counts = cumsum(histogram, axis=1)
+        gains = self._information_gains(left_counts, left_counts[0, -1])
+        split = {"score": self.minimum_split_gain, "feature": None, "bin": None}
+
+        for feature in features:
+            best_bin = argmax(gains[feature])
+
+            if gains[feature, best_bin] > split["score"]:
+                split["score"] = gains[feature, best_bin]
+                split["feature"] = feature
+                split["bin"] = best_bin
+
+        return split["feature"], split["bin"]
+
+    def _children_histograms(
+        self,
+        histogram: ndarray,
+        dataframe: ndarray,
+        target_values: ndarray,
+        left_indexes: ndarray,
+        right_indexes: ndarray,
+    ) -> tuple[ndarray, ndarray]:
+        """
+        Function to get the histograms of the two children: only the smaller one is counted, the other is the parent minus its sibling.
+
+        Input:
+            histogram, ndarray: the class histograms of the parent
+            dataframe, ndarray: The matrix of the bins of the dataframe
+            target_values, ndarray: The matrix of the target labels
+            left_indexes, ndarray: the indexes of the observations of the left child
+            right_indexes, ndarray: the indexes of the observations of the right child
+        Output:
+            tuple[ndarray, ndarray]: the class histograms of the left and the right child
+        """
+        if len(left_indexes) <= len(right_indexes):
+            left_histogram = self._histogram(dataframe, target_values, left_indexes)
+            return left_histogram, histogram - left_histogram
+        right_histogram = self._histogram(dataframe, target_values, right_indexes)
+        return histogram - right_histogram, right_histogram
+
     def _most_common_label(self, target_values: ndarray) -> float:
         """
         The fuction to find the most common label in a serie.
@@ -155,41 +499,125 @@ class CustomDecisionTree:
         """
         return float(argmax(bincount(target_values)))
 
-    def _build_tree(
-        self, dataframe: ndarray, target_values: ndarray, depth: float = 0
-    ) -> Node:
+    def _leaf_value(self, target_values: ndarray) -> float:
         """
-        Function to build the decision tree recursively to a maximum depth.
+        The function to find the value of a leaf, the most common label of its observations.
 
         Input:
-            dataframe, ndarray: The matrix of the values of the dataframe
-            target_values, ndarray: The matrix of the target labels
-            depth, float = 0: the depth into the tree walk-through
+            target_values, ndarray: The matrix of the target labels of the leaf
         Output:
-            Node: the node of the actual depth with the best feature, threshold and the two split children
+            float: the value of the leaf
         """
-        self.number_samples, self.number_features = dataframe.shape
-        self.number_class_labels = len(unique(target_values))
+        return self._most_common_label(target_values)
 
-        if self._is_finished(depth):
-            return Node(value=self._most_common_label(target_values))
+    def _partition(
+        self,
+        dataframe_by_feature: ndarray,
+        indexes: ndarray,
+        start: int,
+        end: int,
+        threshold: float,
+    ) -> int:
+        """
+        Function to divide in place the range [start, end) of the indexes permutation: the indexes of the values <= threshold first,
+        then the others, both in their previous order.
 
-        random_features = random.choice(
-            self.number_features, self.number_features, replace=False
-        )
-        best_feature, best_threshold = self._best_split(
-            dataframe, target_values, random_features
+        Input:
+            dataframe_by_feature, ndarray: The matrix of the values of the feature for all the observations
+            indexes, ndarray: the permutation of the observations indexes, modified in place
+            start, int: the first position of the node into the permutation
+            end, int: the position after the last one of the node into the permutation
+            threshold, float: the number chosen to split in two the node
+        Output:
+            int: the position of the first index of the right child
+        """
+        node_indexes = indexes[start:end]
+        goes_left = dataframe_by_feature[node_indexes] <= threshold
+        indexes[start:end] = concatenate(
+            (node_indexes[goes_left], node_indexes[~goes_left])
         )
+        return start + count_nonzero(goes_left)
 
-        left_indexes, right_indexes = self._create_split(
-            dataframe[:, best_feature], best_threshold
-        )
-        left_child, right_child = self._build_tree(
-            dataframe[left_indexes, :], target_values[left_indexes], depth+1
-        ), self._build_tree(
-            dataframe[right_indexes, :], target_values[right_indexes], depth+1
+    def _build_tree(
+        self, dataframe: ndarray, target_values: ndarray, indexes: ndarray
+    ) -> Node:
+        """
+        Function to build the decision tree to a maximum depth.
+        The dataframe is never copied: each node is a range [start, end) of a single permutation of the observations indexes,
+        partitioned in place, and the nodes are walked depth-first (left child first) with an explicit stack instead of recursion.
+
+        Input:
+            dataframe, ndarray: The matrix of the values of the dataframe (of the bins in histogram mode)
+            target_values, ndarray: The matrix of the target labels
+            indexes, ndarray: the indexes of the training observations, modified in place (they can be repeated)
+        Output:
+            Node: the root node, with the best feature, threshold and the two split children
+        """
+        # without a random_state the features are drawn from the global numpy generator, so numpy.random.seed fixes the tree
+        random_generator = (
+            random if self.random_state is None else random.default_rng(self.random_state)
         )
-        return Node(best_feature, best_threshold, left_child, right_child)
+        root = Node()
+        # (node to fill, start, end, depth, class histograms of the node in histogram mode)
+        stack: list[tuple[Node, int, int, float, Optional[ndarray]]] = [
+            (root, 0, len(indexes), 0, None)
+        ]
+
+        while stack:
+            node, start, end, depth, histogram = stack.pop()
+            node_indexes = indexes[start:end]
+            self.number_samples, self.number_features = len(node_indexes), dataframe.shape[1]
+
+            if self._is_finished(depth, target_values[node_indexes]):
+                node.value = self._leaf_value(target_values[node_indexes])
+                continue
+
+            random_features = random_generator.choice(
+                self.number_features,
+                min(self.maximum_features or self.number_features, self.number_features),
+                replace=False,
+            )
+            if self.bin_edges is None:
+                best_feature, best_threshold = self._best_split(
+                    dataframe, target_values, random_features, node_indexes
+                )
+                split_threshold = best_threshold
+            else:
+                if histogram is None:
+                    histogram = self._histogram(dataframe, target_values, node_indexes)
+                best_feature, split_threshold = self._best_histogram_split(
+                    histogram, random_features
+                )
+                best_threshold = split_threshold
+
+            if best_feature is None:  # No candidate split is acceptable
+                node.value = self._leaf_value(target_values[node_indexes])
+                continue
+            if self.bin_edges is not None:
+                best_threshold = self.bin_edges[best_feature, split_threshold]
+
+            middle = self._partition(
+                dataframe[:, best_feature], indexes, start, end, split_threshold
+            )
+            if middle in (start, end):
+                node.value = self._leaf_value(target_values[node_indexes])
+                continue
+
+            left_histogram, right_histogram = None, None
+            if self.bin_edges is not None:
+                left_histogram, right_histogram = self._children_histograms(
+                    histogram,
+                    dataframe,
+                    target_values,
+                    indexes[start:middle],
+                    indexes[middle:end],
+                )
+            node.feature, node.threshold = best_feature, best_threshold
+            node.left, node.right = Node(), Node()
+            stack.append((node.right, middle, end, depth + 1, right_histogram))
+            stack.append((node.left, start, middle, depth + 1, left_histogram))
+
+        return root
 
     def _traverse_tree(self, serie: ndarray, node: Optional[Node]) -> float:
         """
@@ -203,26 +631,102 @@ class CustomDecisionTree:
         """
         if not node:
             raise Exception("The model need to have been train before predictions")
-        if node.value:  # The nodes with values are the leafs of the tree
+        if node.value is not None:  # The nodes with values are the leafs of the tree
             return node.value
 
         if serie[node.feature] <= node.threshold:
             return self._traverse_tree(serie, node.left)
         return self._traverse_tree(serie, node.right)
 
-    def fit(self, dataframe: ndarray, target_values: ndarray) -> None:
+    def _flatten_tree(self, root: Node) -> FlatTree:
+        """
+        Function to compile the graph of nodes into parallel arrays, the nodes being numbered depth-first.
+
+        Input:
+            root, Node: the root node of the tree
+        Output:
+            FlatTree: the arrays of feature, threshold, left child, right child and value of each node
+        """
+        nodes = []
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            nodes.append(node)
+            if node.value is None:
+                stack.extend((node.right, node.left))
+
+        positions = {id(node): position for position, node in enumerate(nodes)}
+        flat_tree = FlatTree(
+            feature=zeros(len(nodes), dtype=intp),
+            threshold=zeros(len(nodes)),
+            left=full(len(nodes), -1, dtype=intp),
+            right=full(len(nodes), -1, dtype=intp),
+            value=full(len(nodes), nan),
+        )
+        for position, node in enumerate(nodes):
+            if node.value is not None:
+                flat_tree.value[position] = node.value
+                continue
+            flat_tree.feature[position] = node.feature
+            flat_tree.threshold[position] = node.threshold
+            flat_tree.left[position] = positions[id(node.left)]
+            flat_tree.right[position] = positions[id(node.right)]
+        return flat_tree
+
+    def _apply(self, dataframe: ndarray) -> ndarray:
+        """
+        Function to route all the observations of a dataframe to their leaf, one level of the tree at a time.
+
+        Input:
+            dataframe, ndarray: The matrix of the values of the dataframe
+        Output:
+            ndarray: the index into self.flat_tree of the leaf of each observation
+        """
+        if self.flat_tree is None:
+            raise Exception("The model need to have been train before predictions")
+        return self.flat_tree.apply(
+            dataframe, arange(len(dataframe)), zeros(len(dataframe), dtype=intp)
+        )
+
+    def fit(
+        self,
+        dataframe: ndarray,
+        target_values: ndarray,
+        max_bins: Optional[int] = None,
+        sample_indexes: Optional[ndarray] = None,
+    ) -> None:
         """
         Function to build a tree with a dataframe and the target_values corresponding.
+        With max_bins, the features are quantized once into at most max_bins bins and the splits are searched on the class histograms of the nodes
+        (as LightGBM or HistGradientBoosting), the thresholds stay in the scale of the dataframe.
+        The max_features candidate features of each node are drawn from self.random_state (a seed or a numpy Generator), or from the global numpy generator for None.
 
         Input:
             dataframe, ndarray: The matrix of the values of the dataframe
             target_values, ndarray: The matrix of the target labels
+            max_bins (default None), Optional[int]: the maximum number of bins per feature, None for the exact splits
+            sample_indexes (default None), Optional[ndarray]: the indexes of the observations to train on (a bootstrap sample for example), None for all
         Output:
             None
         Self output:
             self.root, Node : self._build_tree method
+            self.flat_tree, FlatTree : the tree compiled into arrays, for the predictions
         """
-        self.root = self._build_tree(dataframe, target_values)
+        target_values = target_values.astype(int)
+        self.number_labels = int(target_values.max()) + 1
+        self.bin_edges = None
+        if max_bins is not None:
+            dataframe = self._bin_dataframe(dataframe, max_bins)
+
+        dataframe = dataframe.view()
+        dataframe.flags.writeable = False
+        indexes = (
+            arange(len(target_values))
+            if sample_indexes is None
+            else sample_indexes.astype(intp)
+        )
+        self.root = self._build_tree(dataframe, target_values, indexes)
+        self.flat_tree = self._flatten_tree(self.root)
 
     def predict(self, dataframe: ndarray) -> ndarray:
         """
@@ -235,4 +739,55 @@ class CustomDecisionTree:
         Output:
             ndarray: The matrix of the predicted target labels
         """
-        return array(self._traverse_tree(serie, self.root) for serie in dataframe)
+        leafs = self._apply(dataframe)
+        return self.flat_tree.value[leafs]
+
+    def save(self, path: str | Path) -> None:
+        """
+        Function to save the trained tree in a model file (tree_models.model_file).
+
+        Prerequisite:
+            Fit training dataframe before
+        Input:
+            path, str | Path: the path of the file
+        Output:
+            None
+        """
+        if self.flat_tree is None:
+            raise Exception("The model need to have been train before saving")
+        arrays = FlatTree.pack([self.flat_tree])
+        if self.bin_edges is not None:
+            arrays["bin_edges"] = self.bin_edges
+        save_model_file(
+            path,
+            type(self).__name__,
+            {
+                "maximum_depth": self.maximum_depth,
+                "min_samples_split": self.minimum_sample_split,
+                "max_features": self.maximum_features,
+                "number_labels": self.number_labels,
+            },
+            arrays,
+        )
+
+    @classmethod
+    def load(cls, path: str | Path) -> "CustomDecisionTree":
+        """
+        Function to load a tree saved by save. The arrays are read-only views of the mapped file, and the tree
+        is only kept compiled (self.root stays None).
+
+        Input:
+            path, str | Path: the path of the file
+        Output:
+            CustomDecisionTree: the trained tree
+        """
+        parameters, arrays = load_model_file(path, cls.__name__)
+        tree = cls(
+            maximum_depth=parameters["maximum_depth"],
+            min_samples_split=parameters["min_samples_split"],
+            max_features=parameters["max_features"],
+        )
+        tree.number_labels = parameters["number_labels"]
+        tree.flat_tree = FlatTree.unpack(arrays)[0]
+        tree.bin_edges = arrays.get("bin_edges")
+        return tree
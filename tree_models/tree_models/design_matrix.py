@@ -0,0 +1,128 @@
+"""On-disk design matrix: a header, a float32 feature block and a label block.
+
+The blocks are contiguous and aligned, so open_design_matrix maps them with np.memmap without copy:
+every process training on the same file shares one page-cached copy of it. The memmaps are ndarrays,
+they are given as they are to the fit methods of the models of tree_models and logistic_regression.
+
+Layout (the header of tree_models.model_file, with its own magic and format version):
+    MAGIC (8 bytes) | header length (uint32 little endian) | header (json) | padding
+    features (rows x columns, float32, C order) | padding | labels (rows)
+"""
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+from numpy import dtype, float32, memmap, ndarray
+
+from tree_models.model_file import _aligned, _read_header, _write_header
+
+MAGIC = b"DMATRIX1"
+FORMAT_VERSION = 1
+_WRITE_BATCH_ROWS = 65_536
+
+
+@dataclass
+class DesignMatrix:
+    features: ndarray
+    labels: ndarray
+    feature_names: list[str] = field(default_factory=list)
+
+
+def write_design_matrix(
+    path: str | Path,
+    features: ndarray,
+    labels: ndarray,
+    feature_names: Optional[list[str]] = None,
+    label_dtype: str = "<i1",
+) -> None:
+    """
+    Function to write a design matrix file. The features are converted to float32 by batches of rows,
+    without a whole float32 copy in memory.
+
+    Input:
+        path, str | Path: the path of the file
+        features, ndarray: the (observations x features) matrix of the values
+        labels, ndarray: the labels of the observations
+        feature_names (default None), Optional[list[str]]: the names of the columns
+        label_dtype (default int8), str: the dtype of the stored labels
+    Output:
+        None
+    """
+    number_rows, number_columns = features.shape
+    if len(labels) != number_rows:
+        raise ValueError(
+            f"{len(labels)} labels for a matrix of {number_rows} observations"
+        )
+    header = {
+        "format_version": FORMAT_VERSION,
+        "rows": number_rows,
+        "columns": number_columns,
+        "label_dtype": dtype(label_dtype).str,
+        "feature_names": list(feature_names or []),
+    }
+
+    with open(path, "wb") as file:
+        features_offset = _write_header(file, MAGIC, header)
+        labels_offset = _aligned(features_offset + number_rows * number_columns * 4)
+        file.truncate(labels_offset + number_rows * dtype(label_dtype).itemsize)
+
+    if number_rows == 0:
+        return
+    stored_features = memmap(
+        path,
+        dtype="<f4",
+        mode="r+",
+        offset=features_offset,
+        shape=(number_rows, number_columns),
+    )
+    for start in range(0, number_rows, _WRITE_BATCH_ROWS):
+        stored_features[start : start + _WRITE_BATCH_ROWS] = features[
+            start : start + _WRITE_BATCH_ROWS
+        ]
+    stored_features.flush()
+    stored_labels = memmap(
+        path, dtype=label_dtype, mode="r+", offset=labels_offset, shape=number_rows
+    )
+    stored_labels[:] = labels
+    stored_labels.flush()
+
+
+def open_design_matrix(path: str | Path) -> DesignMatrix:
+    """
+    Function to map a design matrix file, read-only and without copy.
+
+    Input:
+        path, str | Path: the path of the file
+    Output:
+        DesignMatrix: the memmaps of the features (float32) and of the labels, with the names of the columns
+    """
+    with open(path, "rb") as file:
+        header, features_offset = _read_header(
+            file, MAGIC, FORMAT_VERSION, "design matrix"
+        )
+
+    number_rows, number_columns = header["rows"], header["columns"]
+    labels_offset = _aligned(features_offset + number_rows * number_columns * 4)
+    if number_rows == 0:
+        return DesignMatrix(
+            ndarray((0, number_columns), dtype=float32),
+            ndarray(0, dtype=header["label_dtype"]),
+            header["feature_names"],
+        )
+    return DesignMatrix(
+        memmap(
+            path,
+            dtype="<f4",
+            mode="r",
+            offset=features_offset,
+            shape=(number_rows, number_columns),
+        ),
+        memmap(
+            path,
+            dtype=header["label_dtype"],
+            mode="r",
+            offset=labels_offset,
+            shape=number_rows,
+        ),
+        header["feature_names"],
+    )
@@ -0,0 +1,436 @@
+from pathlib import Path
+from typing import Optional
+from numpy import (
+    arange,
+    array,
+    bincount,
+    clip,
+    empty,
+    full,
+    inf,
+    intp,
+    log,
+    logaddexp,
+    mean,
+    ndarray,
+    ones,
+    random,
+    repeat,
+    sort,
+    tanh,
+    tile,
+    where,
+    zeros,
+)
+
+from tree_models.decision_tree import MAXIMUM_BINS, CustomDecisionTree, FlatTree
+from tree_models.model_file import load_model_file, save_model_file
+
+GRADIENT, HESSIAN, COUNT = 0, 1, 2
+
+
+class GradientTree(CustomDecisionTree):
+    """
+    Regression tree on the gradients and hessians of a loss, for the gradient boosting.
+    It reuses the histogram split search of CustomDecisionTree: the target values are the (observations x 3) matrix
+    of gradient, hessian and 1 (to count the observations), and the histograms sum them per bin instead of counting the labels.
+    """
+
+    def __init__(
+        self,
+        maximum_depth=3,
+        min_samples_split=2,
+        max_features=None,
+        min_samples_leaf=1,
+        l2_regularization=1.0,
+        min_split_gain=0.0,
+        random_state=None,
+    ) -> None:
+        super().__init__(maximum_depth, min_samples_split, max_features, random_state)
+        self.minimum_sample_leaf: int = min_samples_leaf
+        self.l2_regularization: float = l2_regularization
+        # the newton gains can be negative: a node without a split above it stays a leaf
+        self.minimum_split_gain: float = min_split_gain
+
+    def _is_finished(self, depth: float, target_values: ndarray) -> bool:
+        """
+        Boolean function if the walkthrough is finished, there is no class label in a regression tree.
+
+        Input:
+            depth, float : the defined depth into the tree walkthrough
+            target_values, ndarray: The matrix of the gradients, hessians and counts of the node
+        Output:
+            bool : is the walkthrough finished
+        Conditions:
+            maximum_depth exedeed or minimum_sample_split insufficient
+        """
+        return (
+            depth > self.maximum_depth
+            or self.number_samples < self.minimum_sample_split
+        )
+
+    def _histogram(
+        self, binned_dataframe: ndarray, target_values: ndarray, indexes: ndarray
+    ) -> ndarray:
+        """
+        Function to sum the gradients, hessians and counts of each bin of each feature.
+
+        Input:
+            binned_dataframe, ndarray: The matrix of the bins of the dataframe
+            target_values, ndarray: The matrix of the gradients, hessians and counts
+            indexes, ndarray: the indexes of the observations of the node
+        Output:
+            ndarray: the (features x bins x 3) matrix of sums
+        """
+        number_features, number_bins = self.bin_edges.shape
+        cells = (arange(number_features) * number_bins + binned_dataframe[indexes]).ravel()
+        node_targets = target_values[indexes]
+        histogram = empty((number_features * number_bins, 3))
+        for channel in (GRADIENT, HESSIAN, COUNT):
+            histogram[:, channel] = bincount(
+                cells,
+                weights=repeat(node_targets[:, channel], number_features),
+                minlength=number_features * number_bins,
+            )
+        return histogram.reshape(number_features, number_bins, 3)
+
+    def _information_gains(
+        self, left_counts: ndarray, parent_counts: ndarray
+    ) -> ndarray:
+        """
+        Function to calculate the reduction of the second order approximation of the loss of every candidate split.
+
+        Input:
+            left_counts, ndarray: The matrix (... x 3) of the sums of the left children
+            parent_counts, ndarray: The matrix (3) of the sums of the parent
+        Output:
+            ndarray: the gain of each candidate split, -inf when a child has less than min_samples_leaf observations
+        Mathematics expression:
+            1/2 * ( GL² / (HL + l) + GR² / (HR + l) - G² / (H + l) )
+        """
+        right_counts = parent_counts - left_counts
+
+        def score(sums: ndarray) -> ndarray:
+            return sums[..., GRADIENT] ** 2 / (sums[..., HESSIAN] + self.l2_regularization)
+
+        gains = 0.5 * (score(left_counts) + score(right_counts) - score(parent_counts))
+        return where(
+            (left_counts[..., COUNT] < self.minimum_sample_leaf)
+            | (right_counts[..., COUNT] < self.minimum_sample_leaf),
+            -inf,
+            gains,
+        )
+
+    def _leaf_value(self, target_values: ndarray) -> float:
+        """
+        The function to find the value of a leaf, the newton step minimizing the loss of its observations.
+
+        Input:
+            target_values, ndarray: The matrix of the gradients, hessians and counts of the leaf
+        Output:
+            float: the value of the leaf
+        Mathematics expression:
+            - G / (H + l)
+        """
+        sums = target_values.sum(axis=0)
+        return float(-sums[GRADIENT] / (sums[HESSIAN] + self.l2_regularization))
+
+    def fit_gradients(
+        self,
+        binned_dataframe: ndarray,
+        bin_edges: ndarray,
+        target_values: ndarray,
+        sample_indexes: ndarray,
+    ) -> None:
+        """
+        Function to build the tree on an already binned dataframe.
+
+        Input:
+            binned_dataframe, ndarray: The matrix of the bins of the dataframe
+            bin_edges, ndarray: the (features x bins) matrix of the highest value of each bin
+            target_values, ndarray: The matrix of the gradients, hessians and counts
+            sample_indexes, ndarray: the indexes of the observations to train on
+        Output:
+            None
+        Self output:
+            self.root, Node and self.flat_tree, FlatTree : the trained tree
+        """
+        self.bin_edges = bin_edges
+        self.root = self._build_tree(binned_dataframe, target_values, sample_indexes.copy())
+        self.flat_tree = self._flatten_tree(self.root)
+
+
+class CustomGradientBoosting:
+
+    def __init__(
+        self,
+        number_rounds=100,
+        learning_rate=0.1,
+        maximum_depth=3,
+        min_samples_leaf=20,
+        l2_regularization=1.0,
+        min_split_gain=0.0,
+        subsample=1.0,
+        max_features=None,
+        max_bins=MAXIMUM_BINS,
+        early_stopping_rounds=None,
+        threshold=0.5,
+        random_state=None,
+    ) -> None:
+        self.number_rounds: int = number_rounds
+        self.learning_rate: float = learning_rate
+        self.maximum_depth: int = maximum_depth
+        self.minimum_sample_leaf: int = min_samples_leaf
+        self.l2_regularization: float = l2_regularization
+        self.minimum_split_gain: float = min_split_gain
+        self.subsample: float = subsample
+        self.maximum_features: Optional[int] = max_features
+        self.max_bins: int = max_bins
+        self.early_stopping_rounds: Optional[int] = early_stopping_rounds
+        self.threshold: float = threshold
+        self.random_state: Optional[int] = random_state
+        self.base_score: float = 0.0
+        self.flat_trees: list[FlatTree] = []
+        self.losses: list[float] = []
+        self.validation_losses: list[float] = []
+
+    def _sigmoid_transform(self, values: ndarray) -> ndarray:
+        """
+        The sigmoid transformation, to turn the raw scores (log odds) into probabilities.
+
+        Input :
+            values, ndarray : the matrix of raw scores
+        Output :
+            ndarray, the matrix of probabilities
+        It is computed with tanh, which never overflows (unlike e^-x for the very negative scores), as in the logistic regression.
+        Mathematic expression :
+            f(x) = 1 / (1 + e^-x) = 1/2 * tanh(x / 2) + 1/2
+        """
+        return 0.5 * tanh(0.5 * values) + 0.5
+
+    def _lost_function(self, target_values: ndarray, raw_scores: ndarray) -> float:
+        """
+        The binary cross entropy, computed from the raw scores to stay finite for probabilities rounded to 0 or 1.
+
+        Input:
+            target_values, ndarray: the matrix of the labels
+            raw_scores, ndarray : the matrix of the predicted log odds
+        Output:
+            float : the mesure of how much the predictions differs from the labels
+        Mathematic expression : 1/m * S(m, i)[log(1 + e^zi) - yi * zi]
+        """
+        return float(mean(logaddexp(0, raw_scores) - target_values * raw_scores))
+
+    def _tree_scores(self, flat_tree: FlatTree, dataframe: ndarray) -> ndarray:
+        """
+        Function to get the value of the leaf of each observation in a tree.
+
+        Input:
+            flat_tree, FlatTree: the tree
+            dataframe, ndarray: The matrix of the values of the dataframe
+        Output:
+            ndarray: the value of each observation
+        """
+        leafs = flat_tree.apply(
+            dataframe, arange(len(dataframe)), zeros(len(dataframe), dtype=intp)
+        )
+        return flat_tree.value[leafs]
+
+    def fit(
+        self,
+        dataframe: ndarray,
+        target_values: ndarray,
+        validation_dataframe: Optional[ndarray] = None,
+        validation_target_values: Optional[ndarray] = None,
+    ) -> None:
+        """
+        Method to fit the gradient boosting to the dataset. Each round trains a regression tree on the gradients and hessians
+        of the binary cross entropy, shrinked by the learning rate, on a subsample of the observations.
+        The features are binned once for all the rounds. With a validation set, the trees after the round of the best
+        validation loss are dropped, with their losses; with early_stopping_rounds too, the training stops when the validation
+        loss did not improve for early_stopping_rounds rounds.
+        A node is split only when its best gain is above min_split_gain. The subsamples and the features of the trees are drawn
+        from random_state, each tree with its own generator, so the global numpy seed is left untouched.
+
+        Input :
+            dataframe, ndarray : the matrix of value of the dataset
+            target_values, ndarray : the matrix of the labels
+            validation_dataframe (default None), Optional[ndarray] : the matrix of value of the validation dataset
+            validation_target_values (default None), Optional[ndarray] : the matrix of the validation labels
+        Output : None
+        """
+        random_generator = random.default_rng(self.random_state)
+        target_values = target_values.astype(float)
+        number_observations = len(target_values)
+
+        tree_parameters = {
+            "maximum_depth": self.maximum_depth,
+            "max_features": self.maximum_features,
+            "min_samples_leaf": self.minimum_sample_leaf,
+            "l2_regularization": self.l2_regularization,
+            "min_split_gain": self.minimum_split_gain,
+        }
+        binner = GradientTree(**tree_parameters)
+        binned_dataframe = binner._bin_dataframe(dataframe, self.max_bins)
+
+        positive_rate = clip(target_values.mean(), 1e-15, 1 - 1e-15)
+        self.base_score = float(log(positive_rate / (1 - positive_rate)))
+        self.flat_trees, self.losses, self.validation_losses = [], [], []
+        raw_scores = full(number_observations, self.base_score)
+        gradients = ones((number_observations, 3))
+
+        validating = validation_dataframe is not None
+        if validating:
+            validation_target_values = validation_target_values.astype(float)
+            validation_scores = full(len(validation_target_values), self.base_score)
+        best_round, best_loss = 0, inf
+
+        for current_round in range(self.number_rounds):
+            probabilities = self._sigmoid_transform(raw_scores)
+            gradients[:, GRADIENT] = probabilities - target_values
+            gradients[:, HESSIAN] = probabilities * (1 - probabilities)
+
+            sample_indexes = arange(number_observations)
+            if self.subsample < 1.0:
+                sample_indexes = sort(
+                    random_generator.choice(
+                        number_observations,
+                        max(int(self.subsample * number_observations), 1),
+                        replace=False,
+                    )
+                )
+
+            tree = GradientTree(
+                **tree_parameters, random_state=random_generator.integers(2**32)
+            )
+            tree.fit_gradients(binned_dataframe, binner.bin_edges, gradients, sample_indexes)
+            tree.flat_tree.value *= self.learning_rate
+            self.flat_trees.append(tree.flat_tree)
+
+            raw_scores += self._tree_scores(tree.flat_tree, dataframe)
+            self.losses.append(self._lost_function(target_values, raw_scores))
+
+            if not validating:
+                continue
+            validation_scores += self._tree_scores(tree.flat_tree, validation_dataframe)
+            self.validation_losses.append(
+                self._lost_function(validation_target_values, validation_scores)
+            )
+            if self.validation_losses[-1] < best_loss:
+                best_round, best_loss = current_round, self.validation_losses[-1]
+            elif (
+                self.early_stopping_rounds is not None
+                and current_round - best_round >= self.early_stopping_rounds
+            ):
+                break
+
+        if validating:
+            self.flat_trees = self.flat_trees[: best_round + 1]
+            self.losses = self.losses[: best_round + 1]
+            self.validation_losses = self.validation_losses[: best_round + 1]
+
+    def decision_function(self, dataframe: ndarray, batch_size: int = 10_000) -> ndarray:
+        """
+        The raw score (log odds) of each observation: the base score plus the values of its leaf in every tree.
+        All the trees are merged into one and walked at once, by batches of observations to bound the memory.
+
+        Input:
+            dataframe, ndarray: The matrix of the values of the dataframe
+            batch_size (default 10 000), int: the number of observations walked at once
+        Output:
+            ndarray: the matrix of the raw scores
+        """
+        if not self.flat_trees:
+            raise Exception("The model need to have been train before predictions")
+        merged_tree, roots = FlatTree.concatenate(self.flat_trees)
+        raw_scores = full(len(dataframe), self.base_score)
+
+        for start_of_batch in range(0, len(dataframe), batch_size):
+            dataframe_by_batch = dataframe[start_of_batch : start_of_batch + batch_size]
+            number_observations = len(dataframe_by_batch)
+            rows = repeat(arange(number_observations), len(roots))
+            leafs = merged_tree.apply(
+                dataframe_by_batch, rows, tile(roots, number_observations)
+            )
+            raw_scores[start_of_batch : start_of_batch + number_observations] += bincount(
+                rows, weights=merged_tree.value[leafs], minlength=number_observations
+            )
+        return raw_scores
+
+    def predict_proba(self, dataframe: ndarray) -> ndarray:
+        """
+        Probability from 0 to 1 to each observations of a dataframe to be classified as the label.
+
+        Input :
+            dataframe, ndarray : the matrix of the values from the dataframe
+        Output :
+            ndarray : the matrix of probability to be labelized.
+        """
+        return self._sigmoid_transform(self.decision_function(dataframe))
+
+    def predict(self, dataframe: ndarray) -> ndarray:
+        """
+        Binary classification from a dataframe, the observations with a probability superior to the threshold are labelized.
+
+        Input :
+            dataframe, ndarray : the matrix of the values from the dataframe
+        Output :
+            ndarray : the matrix of the predicted labels
+        """
+        return (self.predict_proba(dataframe) > self.threshold).astype(float)
+
+    def save(self, path: str | Path) -> None:
+        """
+        Function to save the trained model in a model file (tree_models.model_file).
+
+        Prerequisite:
+            Fit training dataframe before
+        Input:
+            path, str | Path: the path of the file
+        Output:
+            None
+        """
+        if not self.flat_trees:
+            raise Exception("The model need to have been train before saving")
+        arrays = FlatTree.pack(self.flat_trees)
+        arrays["losses"] = array(self.losses, dtype=float)
+        arrays["validation_losses"] = array(self.validation_losses, dtype=float)
+        save_model_file(
+            path,
+            type(self).__name__,
+            {
+                "number_rounds": self.number_rounds,
+                "learning_rate": self.learning_rate,
+                "maximum_depth": self.maximum_depth,
+                "min_samples_leaf": self.minimum_sample_leaf,
+                "l2_regularization": self.l2_regularization,
+                "min_split_gain": self.minimum_split_gain,
+                "subsample": self.subsample,
+                "max_features": self.maximum_features,
+                "max_bins": self.max_bins,
+                "early_stopping_rounds": self.early_stopping_rounds,
+                "threshold": self.threshold,
+                "random_state": self.random_state,
+                "base_score": self.base_score,
+            },
+            arrays,
+        )
+
+    @classmethod
+    def load(cls, path: str | Path) -> "CustomGradientBoosting":
+        """
+        Function to load a model saved by save, its trees as read-only views of the mapped file.
+
+        Input:
+            path, str | Path: the path of the file
+        Output:
+            CustomGradientBoosting: the trained model
+        """
+        parameters, arrays = load_model_file(path, cls.__name__)
+        base_score = parameters.pop("base_score")
+        model = cls(**parameters)
+        model.base_score = base_score
+        model.flat_trees = FlatTree.unpack(arrays)
+        model.losses = arrays["losses"].tolist()
+        model.validation_losses = arrays["validation_losses"].tolist()
+        return model
@@ -0,0 +1,149 @@
+"""Versioned binary file of a trained model: a json header and aligned array blocks.
+
+Loading maps the file once and gives read-only views of the arrays into the mapping: no unpickling, no copy,
+the pages are shared by every process loading the same model.
+
+Layout:
+    MAGIC (8 bytes) | header length (uint32 little endian) | header (json) | padding
+    array blocks, each one aligned, at the offsets listed in the header
+"""
+
+from json import dumps, loads
+from mmap import ACCESS_READ, mmap
+from pathlib import Path
+from typing import Any, BinaryIO
+from numpy import ascontiguousarray, frombuffer, ndarray
+
+MAGIC = b"TMODEL01"
+FORMAT_VERSION = 1
+_ALIGNMENT = 64
+_LENGTH_BYTES = 4
+
+
+def _aligned(offset: int) -> int:
+    """
+    Function to round an offset up to the alignment of the blocks.
+
+    Input:
+        offset, int: a position in the file
+    Output:
+        int: the first aligned position after offset
+    """
+    return -(-offset // _ALIGNMENT) * _ALIGNMENT
+
+
+def _write_header(file: BinaryIO, magic: bytes, header: dict[str, Any]) -> int:
+    """
+    Function to write the magic, the length of the header and the json header at the start of a file,
+    the layout shared by the binary files of tree_models.
+
+    Input:
+        file, BinaryIO: the file open for writing, at its start
+        magic, bytes: the 8 bytes identifying the kind of file
+        header, dict[str, Any]: the header, json serializable
+    Output:
+        int: the aligned offset of the first block, after the header
+    """
+    encoded = dumps(header).encode()
+    file.write(magic)
+    file.write(len(encoded).to_bytes(_LENGTH_BYTES, "little"))
+    file.write(encoded)
+    return _aligned(len(magic) + _LENGTH_BYTES + len(encoded))
+
+
+def _read_header(
+    file: BinaryIO, magic: bytes, format_version: int, kind: str
+) -> tuple[dict[str, Any], int]:
+    """
+    Function to read and check the header written by _write_header.
+
+    Input:
+        file, BinaryIO: the file open for reading, at its start
+        magic, bytes: the expected magic
+        format_version, int: the latest version of the layout this code reads
+        kind, str: the name of the kind of file, for the errors
+    Output:
+        tuple[dict[str, Any], int]: the header and the aligned offset of the first block
+    """
+    if file.read(len(magic)) != magic:
+        raise ValueError(f"{file.name} is not a {kind} file")
+    header_length = int.from_bytes(file.read(_LENGTH_BYTES), "little")
+    header = loads(file.read(header_length))
+    # the design matrix files written before the version field have the layout of the version 1
+    header.setdefault("format_version", 1)
+    if header["format_version"] > format_version:
+        raise ValueError(
+            f"{file.name} has the format version {header['format_version']}, "
+            f"this version reads up to {format_version}"
+        )
+    return header, _aligned(len(magic) + _LENGTH_BYTES + header_length)
+
+
+def save_model_file(
+    path: str | Path, model: str, parameters: dict[str, Any], arrays: dict[str, ndarray]
+) -> None:
+    """
+    Function to write a model file.
+
+    Input:
+        path, str | Path: the path of the file
+        model, str: the name of the class of the model, checked at loading
+        parameters, dict[str, Any]: the hyperparameters and fitted scalars, json serializable
+        arrays, dict[str, ndarray]: the fitted arrays
+    Output:
+        None
+    """
+    arrays = {name: ascontiguousarray(values) for name, values in arrays.items()}
+    layout, offset = {}, 0
+    for name, values in arrays.items():
+        layout[name] = {
+            "dtype": values.dtype.str,
+            "shape": list(values.shape),
+            "offset": offset,
+        }
+        offset = _aligned(offset + values.nbytes)
+    header = {
+        "format_version": FORMAT_VERSION,
+        "model": model,
+        "parameters": parameters,
+        "arrays": layout,
+    }
+
+    with open(path, "wb") as file:
+        blocks_offset = _write_header(file, MAGIC, header)
+        for name, values in arrays.items():
+            file.seek(blocks_offset + layout[name]["offset"])
+            file.write(values.tobytes())
+        file.truncate(blocks_offset + offset)
+
+
+def load_model_file(
+    path: str | Path, model: str
+) -> tuple[dict[str, Any], dict[str, ndarray]]:
+    """
+    Function to map a model file, read-only.
+
+    Input:
+        path, str | Path: the path of the file
+        model, str: the name of the class of the expected model
+    Output:
+        tuple[dict[str, Any], dict[str, ndarray]]: the parameters and the views of the arrays into the mapped file
+    """
+    with open(path, "rb") as file:
+        header, blocks_offset = _read_header(file, MAGIC, FORMAT_VERSION, "model")
+        mapped = mmap(file.fileno(), 0, access=ACCESS_READ)
+    if header["model"] != model:
+        raise ValueError(f"{path} holds a {header['model']}, not a {model}")
+
+    arrays = {}
+    for name, block in header["arrays"].items():
+        number_values = 1
+        for length in block["shape"]:
+            number_values *= length
+        arrays[name] = frombuffer(
+            mapped,
+            dtype=block["dtype"],
+            count=number_values,
+            offset=blocks_offset + block["offset"],
+        ).reshape(block["shape"])
+    return header["parameters"], arrays
@@ -0,0 +1,325 @@
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from os import cpu_count
+from pathlib import Path
+from typing import Optional
+from numpy import (
+    arange,
+    argmax,
+    bincount,
+    concatenate,
+    float32,
+    intp,
+    ndarray,
+    random,
+    repeat,
+    sqrt,
+    tile,
+    zeros,
+)
+
+from tree_models.decision_tree import CustomDecisionTree, FlatTree
+from tree_models.model_file import load_model_file, save_model_file
+
+_SHARED_DATASET: dict = {}
+
+
+def _attach_shared_dataset(
+    memory_name: str,
+    dataframe_shape: tuple[int, int],
+    dataframe_dtype: str,
+    target_dtype: str,
+) -> None:
+    """
+    Initializer of the workers: map the training matrix and labels written by the parent in shared memory, without copy.
+
+    Input:
+        memory_name, str: the name of the shared memory block
+        dataframe_shape, tuple[int, int]: the shape of the training matrix
+        dataframe_dtype, str: the dtype of the training matrix
+        target_dtype, str: the dtype of the labels, stored right after the matrix
+    Output:
+        None
+    """
+    memory = SharedMemory(name=memory_name)
+    dataframe = ndarray(dataframe_shape, dtype=dataframe_dtype, buffer=memory.buf)
+    target_values = ndarray(
+        dataframe_shape[0],
+        dtype=target_dtype,
+        buffer=memory.buf,
+        offset=dataframe.nbytes,
+    )
+    _SHARED_DATASET.update(
+        memory=memory, dataframe=dataframe, target_values=target_values
+    )
+
+
+def _fit_tree(
+    seed: int, tree_parameters: dict, max_bins: Optional[int]
+) -> FlatTree:
+    """
+    Function to train one tree of the forest on a bootstrap sample of the dataset shared with the worker.
+
+    Input:
+        seed, int: the seed of the bootstrap sample and of the features subsampling of the tree
+        tree_parameters, dict: the parameters of CustomDecisionTree
+        max_bins, Optional[int]: the maximum number of bins per feature, None for the exact splits
+    Output:
+        FlatTree: the tree compiled into arrays (cheaper to send back than the graph of nodes)
+    """
+    dataframe, target_values = (
+        _SHARED_DATASET["dataframe"],
+        _SHARED_DATASET["target_values"],
+    )
+    random_generator = random.default_rng(seed)
+    sample_indexes = random_generator.integers(0, len(target_values), len(target_values))
+
+    tree = CustomDecisionTree(**tree_parameters, random_state=random_generator)
+    tree.fit(dataframe, target_values, max_bins, sample_indexes)
+    return tree.flat_tree
+
+
+class CustomRandomForest:
+
+    def __init__(
+        self,
+        number_trees=100,
+        maximum_depth=100,
+        min_samples_split=2,
+        max_features=None,
+        n_jobs=None,
+        random_state=None,
+    ) -> None:
+        self.number_trees: int = number_trees
+        self.maximum_depth: int = maximum_depth
+        self.minimum_sample_split: int = min_samples_split
+        self.maximum_features: Optional[int] = max_features
+        self.number_jobs: Optional[int] = n_jobs
+        self.random_state: Optional[int] = random_state
+        self.flat_trees: list[FlatTree] = []
+        self.number_labels: int = 0
+
+    def _number_workers(self) -> int:
+        """
+        Function to get the number of processes to train the trees with.
+
+        Output:
+            int: n_jobs, all the cores for -1, a single process for None
+        """
+        if self.number_jobs is None:
+            return 1
+        if self.number_jobs < 0:
+            return cpu_count() or 1
+        return self.number_jobs
+
+    def _fit_trees_in_pool(
+        self,
+        dataframe: ndarray,
+        target_values: ndarray,
+        seeds: ndarray,
+        tree_parameters: dict,
+        max_bins: Optional[int],
+    ) -> list[FlatTree]:
+        """
+        Function to train the trees in a process pool. The dataset is copied once in shared memory and mapped by every worker,
+        instead of being pickled to each of them.
+
+        Input:
+            dataframe, ndarray: The matrix of the values of the dataframe
+            target_values, ndarray: The matrix of the target labels
+            seeds, ndarray: the seed of each tree
+            tree_parameters, dict: the parameters of CustomDecisionTree
+            max_bins, Optional[int]: the maximum number of bins per feature, None for the exact splits
+        Output:
+            list[FlatTree]: the trained trees, in the order of the seeds
+        """
+        memory = SharedMemory(create=True, size=dataframe.nbytes + target_values.nbytes)
+        try:
+            ndarray(dataframe.shape, dtype=dataframe.dtype, buffer=memory.buf)[:] = (
+                dataframe
+            )
+            ndarray(
+                target_values.shape,
+                dtype=target_values.dtype,
+                buffer=memory.buf,
+                offset=dataframe.nbytes,
+            )[:] = target_values
+
+            with ProcessPoolExecutor(
+                max_workers=self._number_workers(),
+                initializer=_attach_shared_dataset,
+                initargs=(
+                    memory.name,
+                    dataframe.shape,
+                    dataframe.dtype.str,
+                    target_values.dtype.str,
+                ),
+            ) as executor:
+                return list(
+                    executor.map(
+                        _fit_tree,
+                        seeds.tolist(),
+                        [tree_parameters] * len(seeds),
+                        [max_bins] * len(seeds),
+                    )
+                )
+        finally:
+            memory.close()
+            memory.unlink()
+
+    def fit(
+        self,
+        dataframe: ndarray,
+        target_values: ndarray,
+        max_bins: Optional[int] = None,
+    ) -> None:
+        """
+        Function to train a forest of decision trees, each one on a bootstrap sample of the dataframe
+        and with max_features random features to choose from at each split.
+
+        Input:
+            dataframe, ndarray: The matrix of the values of the dataframe
+            target_values, ndarray: The matrix of the target labels
+            max_bins (default None), Optional[int]: the maximum number of bins per feature of each tree, None for the exact splits
+        Output:
+            None
+        Self output:
+            self.flat_trees, list[FlatTree] : the trees compiled into arrays
+        """
+        dataframe, target_values = (
+            dataframe.astype(float32 if dataframe.dtype == float32 else float, copy=False),
+            target_values.astype(int, copy=False),
+        )
+        self.number_labels = int(target_values.max()) + 1
+        tree_parameters = {
+            "maximum_depth": self.maximum_depth,
+            "min_samples_split": self.minimum_sample_split,
+            "max_features": self.maximum_features
+            or max(int(sqrt(dataframe.shape[1])), 1),
+        }
+        seeds = random.default_rng(self.random_state).integers(
+            2**32, size=self.number_trees
+        )
+
+        if self._number_workers() == 1:
+            _SHARED_DATASET.update(dataframe=dataframe, target_values=target_values)
+            try:
+                self.flat_trees = [
+                    _fit_tree(seed, tree_parameters, max_bins) for seed in seeds.tolist()
+                ]
+            finally:
+                _SHARED_DATASET.clear()
+            return
+
+        self.flat_trees = self._fit_trees_in_pool(
+            dataframe, target_values, seeds, tree_parameters, max_bins
+        )
+
+    def _votes(self, dataframe: ndarray, batch_size: int = 10_000) -> ndarray:
+        """
+        Function to count the votes of the trees for each label. All the trees are merged into one and walked at once,
+        by batches of observations to bound the memory.
+
+        Input:
+            dataframe, ndarray: The matrix of the values of the dataframe
+            batch_size (default 10 000), int: the number of observations walked at once
+        Output:
+            ndarray: the (observations x labels) matrix of the number of votes
+        """
+        if not self.flat_trees:
+            raise Exception("The model need to have been train before predictions")
+        merged_tree, roots = FlatTree.concatenate(self.flat_trees)
+        votes = []
+
+        for start_of_batch in range(0, len(dataframe), batch_size):
+            dataframe_by_batch = dataframe[start_of_batch : start_of_batch + batch_size]
+            number_observations = len(dataframe_by_batch)
+            rows = repeat(arange(number_observations), len(roots))
+            leafs = merged_tree.apply(
+                dataframe_by_batch, rows, tile(roots, number_observations)
+            )
+            votes.append(
+                bincount(
+                    rows * self.number_labels + merged_tree.value[leafs].astype(int),
+                    minlength=number_observations * self.number_labels,
+                ).reshape(number_observations, self.number_labels)
+            )
+
+        if not votes:
+            return zeros((0, self.number_labels), dtype=intp)
+        return concatenate(votes)
+
+    def predict(self, dataframe: ndarray) -> ndarray:
+        """
+        Function to predict target values from a dataframe, the most voted label among the trees.
+
+        Prerequisite:
+            Fit training dataframe before
+        Input:
+            dataframe, ndarray: The matrix of the values of the dataframe
+        Output:
+            ndarray: The matrix of the predicted target labels
+        """
+        return argmax(self._votes(dataframe), axis=1).astype(float)
+
+    def predict_proba(self, dataframe: ndarray) -> ndarray:
+        """
+        Function to get the proportion of the trees voting for each label.
+
+        Prerequisite:
+            Fit training dataframe before
+        Input:
+            dataframe, ndarray: The matrix of the values of the dataframe
+        Output:
+            ndarray: the (observations x labels) matrix of the proportions of votes
+        """
+        return self._votes(dataframe) / len(self.flat_trees)
+
+    def save(self, path: str | Path) -> None:
+        """
+        Function to save the trained forest in a model file (tree_models.model_file).
+
+        Prerequisite:
+            Fit training dataframe before
+        Input:
+            path, str | Path: the path of the file
+        Output:
+            None
+        """
+        if not self.flat_trees:
+            raise Exception("The model need to have been train before saving")
+        save_model_file(
+            path,
+            type(self).__name__,
+            {
+                "number_trees": self.number_trees,
+                "maximum_depth": self.maximum_depth,
+                "min_samples_split": self.minimum_sample_split,
+                "max_features": self.maximum_features,
+                "random_state": self.random_state,
+                "number_labels": self.number_labels,
+            },
+            FlatTree.pack(self.flat_trees),
+        )
+
+    @classmethod
+    def load(cls, path: str | Path) -> "CustomRandomForest":
+        """
+        Function to load a forest saved by save, its trees as read-only views of the mapped file.
+
+        Input:
+            path, str | Path: the path of the file
+        Output:
+            CustomRandomForest: the trained forest
+        """
+        parameters, arrays = load_model_file(path, cls.__name__)
+        forest = cls(
+            number_trees=parameters["number_trees"],
+            maximum_depth=parameters["maximum_depth"],
+            min_samples_split=parameters["min_samples_split"],
+            max_features=parameters["max_features"],
+            random_state=parameters["random_state"],
+        )
+        forest.number_labels = parameters["number_labels"]
+        forest.flat_trees = FlatTree.unpack(arrays)
+        return forest